@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Tag attached to entries that aggregate over every location; any write
+# invalidates them.
+ALL_LOCATIONS = "*"
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with a per-entry TTL and LRU eviction once
+    `maxsize` entries are held.
+
+    Entries can carry tags (e.g. location ids) so writers can drop exactly
+    the results they made stale with `invalidate_tags`.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, tags, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, tags=(), ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, frozenset(tags), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, tags=()):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value, tags)
+        return value
+
+    def delete(self, key) -> bool:
+        with self._lock:
+            if self._data.pop(key, None) is None:
+                return False
+            self.invalidations += 1
+            return True
+
+    def invalidate_tags(self, tags):
+        tags = set(tags)
+        with self._lock:
+            stale = [k for k, (_, entry_tags, _) in self._data.items() if entry_tags & tags]
+            for k in stale:
+                del self._data[k]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# ----------------------------
+# Shared analytics result cache
+# ----------------------------
+analytics_cache = TTLCache(
+    ttl=float(os.environ.get("ANALYTICS_CACHE_TTL", "300")),
+    maxsize=int(os.environ.get("ANALYTICS_CACHE_SIZE", "1024")),
+)
+
+
+def invalidate_locations(location_ids):
+    """Drop cached analytics that depend on any of `location_ids`."""
+    location_ids = set(location_ids)
+    if not location_ids:
+        return 0
+    return analytics_cache.invalidate_tags(location_ids | {ALL_LOCATIONS})
+
+
+# ----------------------------
+# Closed trend buckets
+# ----------------------------
+# New reports always land in the current (open) bucket, so closed buckets
+# only change when reports are deleted; those deletions invalidate them.
+trend_cache = TTLCache(
+    ttl=float(os.environ.get("TREND_CACHE_TTL", "900")),
+    maxsize=int(os.environ.get("TREND_CACHE_SIZE", "256")),
+)
+
+
+def invalidate_closed_buckets(location_ids):
+    """Drop cached closed trend buckets that may include removed reports."""
+    location_ids = set(location_ids)
+    if not location_ids:
+        return 0
+    return trend_cache.invalidate_tags(location_ids | {ALL_LOCATIONS})
+
+
+# ----------------------------
+# Validated session tokens
+# ----------------------------
+# Entries never outlive the session they stand for. Every path that deletes
+# sessions or accounts drops them here (per token or per user); other worker
+# processes re-check the sessions row within SESSION_CACHE_TTL seconds.
+session_cache = TTLCache(
+    ttl=float(os.environ.get("SESSION_CACHE_TTL", "15")),
+    maxsize=int(os.environ.get("SESSION_CACHE_SIZE", "10000")),
+)
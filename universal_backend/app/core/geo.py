@@ -0,0 +1,84 @@
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+# Precision stored on every location; heatmap cells use a prefix of it
+GEOHASH_PRECISION = 9
+
+# Map zoom level -> geohash length of the cells returned for that zoom.
+# Cell widths: 1 ≈ 5000 km, 3 ≈ 156 km, 5 ≈ 4.9 km, 6 ≈ 1.2 km, 7 ≈ 153 m.
+_ZOOM_PRECISION = [
+    (2, 1),
+    (5, 2),
+    (7, 3),
+    (10, 4),
+    (12, 5),
+    (14, 6),
+    (16, 7),
+]
+
+
+def parse_coordinate(value):
+    """Parse a stored latitude/longitude string; None if it is not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bit, ch, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch = ch << 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit, ch = 0, 0
+    return "".join(chars)
+
+
+def bounds(geohash: str):
+    """(min_lat, min_lng, max_lat, max_lng) of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for c in geohash:
+        bits = _DECODE[c]
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (bits >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def center(geohash: str):
+    min_lat, min_lng, max_lat, max_lng = bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+
+def snap_to_cells(min_lat: float, min_lng: float, max_lat: float, max_lng: float, precision: int):
+    """Grow a bounding box outward to the edges of the geohash cells of length `precision` it touches."""
+    low = bounds(encode(min_lat, min_lng, precision))
+    high = bounds(encode(max_lat, max_lng, precision))
+    return low[0], low[1], high[2], high[3]
+
+
+def precision_for_zoom(zoom: int) -> int:
+    for max_zoom, precision in _ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return 8
@@ -0,0 +1,53 @@
+import os
+import json
+import base64
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = int(os.environ.get("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "200"))
+
+
+def clamp_limit(limit) -> int:
+    """Page size within [1, MAX_PAGE_SIZE]; DEFAULT_PAGE_SIZE when unset."""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_cursor(*values) -> str:
+    """Opaque cursor for the sort key of the last row on a page."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def decode_report_cursor(cursor: str):
+    """(date_reported, report_id) from a report-listing cursor."""
+    values = decode_cursor(cursor)
+    try:
+        date_reported, report_id = values
+        return datetime.fromisoformat(date_reported), int(report_id)
+    except (TypeError, ValueError):
+        raise ValueError("invalid cursor")
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """Primary key from an id-ordered listing cursor."""
+    values = decode_cursor(cursor)
+    try:
+        (last_id,) = values
+        return int(last_id)
+    except (TypeError, ValueError):
+        raise ValueError("invalid cursor")
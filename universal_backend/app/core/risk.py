@@ -0,0 +1,106 @@
+import numpy as np
+
+# Default window the risk levels are computed over
+RISK_WINDOW_DAYS = 90
+
+# Rate thresholds, in reports per 30 days
+HIGH_RATE = 20
+MEDIUM_RATE = 5
+
+# Percentile thresholds (mid-rank among the locations with any reports)
+HIGH_PERCENTILE = 0.90
+MEDIUM_PERCENTILE = 0.70
+# Percentile tiers only apply from this many reports, so a single report in
+# an otherwise quiet city is not flagged as high risk
+MIN_COUNT_FOR_PERCENTILE = 3
+
+LEVELS = np.array(["Low", "Medium", "High"])
+
+
+def _percentiles(counts: np.ndarray) -> np.ndarray:
+    """
+    For every non-zero cell, its mid-rank among the non-zero cells of the
+    same column: (rows below + half the rows equal) / non-zero rows. Zero
+    cells get 0. Most locations have no reports for most crime types, so
+    ranking against them would put any location with a few reports in the
+    top tier. Vectorized over all columns at once by shifting each column
+    into its own disjoint value range and running a single sort +
+    searchsorted.
+    """
+    n, cols = counts.shape
+    if n == 0:
+        return np.zeros(counts.shape)
+    span = int(counts.max()) + 1
+    offsets = np.arange(cols) * n
+    shifted = counts + np.arange(cols) * span
+    flat_sorted = np.sort(shifted, axis=None)
+    below = np.searchsorted(flat_sorted, shifted, side="left") - offsets
+    at_or_below = np.searchsorted(flat_sorted, shifted, side="right") - offsets
+    zeros = (counts == 0).sum(axis=0)
+    nonzero = np.maximum(n - zeros, 1)
+    mid_rank = (below - zeros) + 0.5 * (at_or_below - below)
+    return np.where(counts > 0, mid_rank / nonzero, 0.0)
+
+
+def _tiers(counts: np.ndarray, window_days: int) -> np.ndarray:
+    """0 = Low, 1 = Medium, 2 = High for every cell of `counts`."""
+    rates = counts * (30.0 / max(window_days, 1))
+    rate_tier = (rates >= MEDIUM_RATE).astype(np.int8) + (rates >= HIGH_RATE)
+
+    pct = _percentiles(counts)
+    eligible = counts >= MIN_COUNT_FOR_PERCENTILE
+    pct_tier = ((pct >= MEDIUM_PERCENTILE) & eligible).astype(np.int8) + ((pct >= HIGH_PERCENTILE) & eligible)
+
+    return np.maximum(rate_tier, pct_tier)
+
+
+class RiskMatrix:
+    """
+    Risk levels for every location × crime type cell over one window.
+
+    Built once from the full count matrix; per-location lookups afterwards
+    are a dictionary hit plus a row slice.
+    """
+
+    def __init__(self, location_ids: list, areas: list, crime_types: list, counts: np.ndarray, window_days: int):
+        self.location_ids = location_ids
+        self.areas = areas
+        self.crime_types = crime_types
+        self.window_days = window_days
+        self.counts = counts
+        self.totals = counts.sum(axis=1)
+        self.levels = _tiers(counts, window_days)
+        self.location_levels = _tiers(self.totals.reshape(-1, 1), window_days)[:, 0]
+        self._row = {loc_id: i for i, loc_id in enumerate(location_ids)}
+
+    def for_location(self, location_id: int) -> list:
+        i = self._row.get(location_id)
+        levels = self.levels[i] if i is not None else np.zeros(len(self.crime_types), dtype=np.int8)
+        return [
+            {"crime_type": name, "level": str(LEVELS[level])}
+            for name, level in zip(self.crime_types, levels)
+        ]
+
+    def location_summary(self) -> list:
+        return [
+            {
+                "location_id": loc_id,
+                "area": area,
+                "count": int(total),
+                "level": str(LEVELS[level]),
+            }
+            for loc_id, area, total, level in zip(self.location_ids, self.areas, self.totals, self.location_levels)
+        ]
+
+    def citywide(self) -> list:
+        names = self.crime_types
+        return [
+            {
+                **loc,
+                "crime_types": [
+                    {"crime_type": name, "count": int(c), "level": str(LEVELS[l])}
+                    for name, c, l in zip(names, self.counts[i], self.levels[i])
+                ],
+            }
+            for i, loc in enumerate(self.location_summary())
+        ]
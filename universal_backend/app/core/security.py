@@ -1,3 +1,9 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
 # Use Argon2 as the preferred hashing scheme to avoid bcrypt's 72-byte
@@ -21,4 +27,101 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+# ----------------------------
+# Worker pool for async callers
+# ----------------------------
+# Argon2 takes tens of milliseconds of CPU per call. Async handlers await
+# these wrappers so the hash runs on a small dedicated pool instead of the
+# event loop. argon2-cffi releases the GIL while hashing, so threads run in
+# parallel. At most HASH_MAX_PENDING calls may be queued or running; past
+# that, HasherBusy is raised and the API answers 503 instead of letting a
+# login storm back up behind the pool.
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_PENDING = int(os.environ.get("HASH_MAX_PENDING", str(HASH_WORKERS * 16)))
+
+
+class HasherBusy(RuntimeError):
+    """The password hashing queue is full; the caller should retry later."""
+
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="argon2")
+_lock = threading.Lock()
+_pending = 0
+_metrics = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "max_pending": 0,
+    "wait_time": 0.0,
+    "run_time": 0.0,
+}
+
+
+def _run(fn, args, enqueued: float):
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        finished = time.perf_counter()
+        with _lock:
+            _metrics["completed"] += 1
+            _metrics["wait_time"] += started - enqueued
+            _metrics["run_time"] += finished - started
+
+
+def _release(future=None):
+    # Also runs for futures cancelled while still queued
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+async def _offload(fn, *args):
+    global _pending
+    with _lock:
+        if _pending >= HASH_MAX_PENDING:
+            _metrics["rejected"] += 1
+            raise HasherBusy("password hashing queue is full")
+        _pending += 1
+        _metrics["submitted"] += 1
+        _metrics["max_pending"] = max(_metrics["max_pending"], _pending)
+    try:
+        future = _executor.submit(_run, fn, args, time.perf_counter())
+    except BaseException:
+        _release()
+        raise
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the hashing pool. Raises HasherBusy when the queue is full."""
+    return await _offload(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the hashing pool. Raises HasherBusy when the queue is full."""
+    return await _offload(verify_password, plain_password, hashed_password)
+
+
+def hasher_stats() -> dict:
+    with _lock:
+        completed = _metrics["completed"]
+        return {
+            "workers": HASH_WORKERS,
+            "max_pending": HASH_MAX_PENDING,
+            "pending": _pending,
+            "peak_pending": _metrics["max_pending"],
+            "submitted": _metrics["submitted"],
+            "completed": completed,
+            "rejected": _metrics["rejected"],
+            "avg_wait_ms": round(_metrics["wait_time"] * 1000 / completed, 2) if completed else 0.0,
+            "avg_run_ms": round(_metrics["run_time"] * 1000 / completed, 2) if completed else 0.0,
+        }
+
+
+def shutdown_hasher():
+    _executor.shutdown(wait=False, cancel_futures=True)
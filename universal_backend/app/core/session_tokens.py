@@ -0,0 +1,140 @@
+import os
+import uuid
+import threading
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+# Session token modes:
+#   db  — opaque random tokens, one row per session in the sessions table (default)
+#   jwt — HS256-signed tokens carrying user_type/user_id/exp; validating one
+#         is a signature check plus an in-memory denylist lookup
+SESSION_TOKEN_MODE = os.environ.get("SESSION_TOKEN_MODE", "db").lower()
+JWT_MODE = SESSION_TOKEN_MODE == "jwt"
+SESSION_SECRET = os.environ.get("SESSION_SECRET", "")
+ALGORITHM = "HS256"
+# Upper bound on a signed token's lifetime; a per-user revocation is kept this long
+SESSION_TOKEN_MAX_HOURS = int(os.environ.get("SESSION_TOKEN_MAX_HOURS", "168"))
+
+if SESSION_TOKEN_MODE not in ("db", "jwt"):
+    raise RuntimeError(f"SESSION_TOKEN_MODE must be 'db' or 'jwt', not {SESSION_TOKEN_MODE!r}")
+if JWT_MODE and len(SESSION_SECRET) < 32:
+    raise RuntimeError("SESSION_TOKEN_MODE=jwt needs SESSION_SECRET of at least 32 characters")
+
+
+def looks_signed(token: str) -> bool:
+    """Signed tokens have three dot-separated parts; opaque DB tokens have none."""
+    return token.count(".") == 2
+
+
+def _timestamp(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _utc(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def issue(user_type: str, user_id: int, hours_valid: int = 24) -> tuple:
+    """(token, jti, issued_at, expires_at) for a new signed session; datetimes are naive UTC."""
+    issued_at = datetime.utcnow()
+    expires_at = issued_at + timedelta(hours=min(hours_valid, SESSION_TOKEN_MAX_HOURS))
+    jti = uuid.uuid4().hex
+    claims = {
+        "user_type": user_type,
+        "user_id": user_id,
+        "jti": jti,
+        "iat": _timestamp(issued_at),
+        "exp": _timestamp(expires_at),
+    }
+    return jwt.encode(claims, SESSION_SECRET, algorithm=ALGORITHM), jti, issued_at, expires_at
+
+
+def decode(token: str, verify_exp: bool = True):
+    """Verified claims of a signed token, or None if it is forged, malformed or expired."""
+    try:
+        claims = jwt.decode(
+            token,
+            SESSION_SECRET,
+            algorithms=[ALGORITHM],
+            options={"require": ["user_type", "user_id", "jti", "iat", "exp"], "verify_exp": verify_exp},
+        )
+    except jwt.InvalidTokenError:
+        return None
+    claims["issued_at"] = _utc(claims["iat"])
+    claims["expires_at"] = _utc(claims["exp"])
+    return claims
+
+
+# ----------------------------
+# In-memory denylist
+# ----------------------------
+class Denylist:
+    """
+    Revoked token ids and per-user revocation cut-offs, mirrored from the
+    revoked_tokens table. Revocations made in this process apply at once;
+    those made by other workers arrive with the next `load`.
+    """
+
+    def __init__(self):
+        self._jtis = {}
+        self._users = {}
+        self._lock = threading.Lock()
+        self.last_revocation_id = 0
+
+    def revoke_jti(self, jti: str, expires_at: datetime):
+        with self._lock:
+            self._jtis[jti] = expires_at
+
+    def revoke_user(self, user_type: str, user_id: int, revoked_at: datetime):
+        key = (user_type, user_id)
+        with self._lock:
+            self._users[key] = max(revoked_at, self._users.get(key, revoked_at))
+
+    def is_revoked(self, claims: dict) -> bool:
+        with self._lock:
+            if claims["jti"] in self._jtis:
+                return True
+            cutoff = self._users.get((claims["user_type"], claims["user_id"]))
+        return cutoff is not None and claims["issued_at"] <= cutoff
+
+    def load(self, rows):
+        """Merge RevokedToken rows (ascending revocation_id) into the denylist."""
+        for row in rows:
+            if row.jti:
+                self.revoke_jti(row.jti, row.expires_at)
+            else:
+                self.revoke_user(row.user_type, row.user_id, row.revoked_at)
+            self.last_revocation_id = max(self.last_revocation_id, row.revocation_id)
+
+    def prune(self, now: datetime = None) -> int:
+        """Forget revocations whose tokens have all expired; returns entries dropped."""
+        now = now or datetime.utcnow()
+        user_horizon = now - timedelta(hours=SESSION_TOKEN_MAX_HOURS)
+        with self._lock:
+            jtis = [j for j, exp in self._jtis.items() if exp <= now]
+            users = [k for k, cutoff in self._users.items() if cutoff <= user_horizon]
+            for j in jtis:
+                del self._jtis[j]
+            for k in users:
+                del self._users[k]
+        return len(jtis) + len(users)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "revoked_tokens": len(self._jtis),
+                "revoked_users": len(self._users),
+                "last_revocation_id": self.last_revocation_id,
+            }
+
+
+denylist = Denylist()
+
+
+def validate(token: str):
+    """Claims of a live, unrevoked signed token, or None. No I/O."""
+    claims = decode(token)
+    if claims is None or denylist.is_revoked(claims):
+        return None
+    return claims
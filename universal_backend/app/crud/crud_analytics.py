@@ -1,97 +1,253 @@
+import os
+
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, and_
 from datetime import datetime, timedelta
 
-from ..models.sqlalchemy_models import Report, CrimeType
+from ..models.sqlalchemy_models import Report, CrimeType, Location, DailyCrimeCount
+from .crud_rollups import window_start
+from ..core.cache import analytics_cache, ALL_LOCATIONS
+from ..core.risk import RiskMatrix, RISK_WINDOW_DAYS
+from ..core import geo
 
 
 def parse_range(range: str):
-    n = int(range.split()[0])
-    return datetime.utcnow() - timedelta(days=n)
+    return int(range.split()[0])
 
 
 # -------------------------------------------------
-# 1) SUMMARY — reports count grouped by crime type
+# 0) CRIME TYPE COUNTS — shared single-pass aggregate
 # -------------------------------------------------
-def get_summary(db: Session, location_id: int, crime_type_id: int, range: str):
-    since = parse_range(range)
+def get_crime_type_counts(db: Session, location_id: int, days: int = None):
+    """
+    Count reports per crime type for a location in one grouped query over
+    the daily rollup. Only rollup rows inside the window are joined, so the
+    query reads at most `days` rows per crime type however long the history.
+
+    Every crime type is returned (zero counts included) with:
+      - recent: report count over the last `days` days (all time when no `days`)
+    """
+    # In the join condition, not WHERE, so crime types with no rows in the
+    # window still come back with a zero count
+    joined = [
+        DailyCrimeCount.crime_type_id == CrimeType.crime_type_id,
+        DailyCrimeCount.location_id == location_id,
+    ]
+    if days is not None:
+        joined.append(DailyCrimeCount.day >= window_start(days))
 
-    query = (
+    results = (
         db.query(
+            CrimeType.crime_type_id.label("crime_type_id"),
             CrimeType.name.label("crime_type"),
-            func.count(Report.report_id).label("count")
+            func.coalesce(func.sum(DailyCrimeCount.count), 0).label("recent"),
         )
-        .join(CrimeType, CrimeType.crime_type_id == Report.crime_type_id)
-        .filter(Report.location_id == location_id)
-        .filter(Report.created_at >= since)
+        .outerjoin(DailyCrimeCount, and_(*joined))
+        .group_by(CrimeType.crime_type_id, CrimeType.name)
+        .order_by(CrimeType.crime_type_id)
+        .all()
     )
 
-    if crime_type_id:
-        query = query.filter(Report.crime_type_id == crime_type_id)
-
-    results = query.group_by(CrimeType.name).all()
-
     return [
-        {"crime_type": r.crime_type, "count": r.count}
+        {
+            "crime_type_id": r.crime_type_id,
+            "crime_type": r.crime_type,
+            "recent": int(r.recent),
+        }
         for r in results
     ]
 
 
 # -------------------------------------------------
-# 2) RISK LEVELS — simple rule-based scoring
+# 0b) RISK MATRIX — location × crime type counts, scored in NumPy
 # -------------------------------------------------
-def get_risk_levels(db: Session, location_id: int):
-    # Count number of reports for each crime type
+# Risk levels move slowly; other workers' writes reach this worker's
+# matrix within this many seconds (its own writes invalidate it at once).
+RISK_MATRIX_TTL = float(os.environ.get("RISK_MATRIX_TTL", "60"))
+
+
+def _build_risk_matrix(db: Session, days: int) -> RiskMatrix:
+    locations = db.query(Location.location_id, Location.area).order_by(Location.location_id).all()
+    crime_types = db.query(CrimeType.crime_type_id, CrimeType.name).order_by(CrimeType.crime_type_id).all()
+
+    row = {l.location_id: i for i, l in enumerate(locations)}
+    col = {c.crime_type_id: j for j, c in enumerate(crime_types)}
+    counts = np.zeros((len(locations), len(crime_types)), dtype=np.int64)
+
+    cells = (
+        db.query(
+            DailyCrimeCount.location_id,
+            DailyCrimeCount.crime_type_id,
+            func.sum(DailyCrimeCount.count).label("count"),
+        )
+        .filter(DailyCrimeCount.day >= window_start(days))
+        .group_by(DailyCrimeCount.location_id, DailyCrimeCount.crime_type_id)
+        .all()
+    )
+    for c in cells:
+        if c.location_id in row and c.crime_type_id in col:
+            counts[row[c.location_id], col[c.crime_type_id]] = int(c.count)
+
+    return RiskMatrix(
+        location_ids=[l.location_id for l in locations],
+        areas=[l.area for l in locations],
+        crime_types=[c.name for c in crime_types],
+        counts=counts,
+        window_days=days,
+    )
+
+
+def get_risk_matrix(db: Session, days: int = RISK_WINDOW_DAYS) -> RiskMatrix:
+    """Risk levels for every location and crime type, cached per window."""
+    key = ("risk_matrix", days)
+    matrix = analytics_cache.get(key)
+    if matrix is None:
+        matrix = _build_risk_matrix(db, days)
+        analytics_cache.set(key, matrix, tags=[ALL_LOCATIONS], ttl=RISK_MATRIX_TTL)
+    return matrix
+
+
+# -------------------------------------------------
+# 0c) HEATMAP CELLS — viewport-bounded, pre-binned by geohash prefix
+# -------------------------------------------------
+def get_heatmap_cells(db: Session, min_lat: float, min_lng: float, max_lat: float, max_lng: float,
+                      precision: int, days: int):
+    """
+    Report counts over the last `days` days for the locations inside a
+    bounding box, grouped into geohash cells of length `precision`.
+    """
+    cell = func.substr(Location.geohash, 1, precision)
     results = (
         db.query(
-            CrimeType.name.label("crime_type"),
-            func.count(Report.report_id).label("count")
+            cell.label("cell"),
+            func.sum(DailyCrimeCount.count).label("count"),
         )
-        .join(CrimeType, CrimeType.crime_type_id == Report.crime_type_id)
-        .filter(Report.location_id == location_id)
-        .group_by(CrimeType.name)
+        .join(DailyCrimeCount, DailyCrimeCount.location_id == Location.location_id)
+        .filter(
+            Location.lat.between(min_lat, max_lat),
+            Location.lng.between(min_lng, max_lng),
+            Location.geohash.isnot(None),
+            DailyCrimeCount.day >= window_start(days),
+        )
+        .group_by(cell)
+        .having(func.sum(DailyCrimeCount.count) > 0)
         .all()
     )
 
-    risk_data = []
+    cells = []
     for r in results:
-        if r.count >= 15:
-            level = "High"
-        elif r.count >= 5:
-            level = "Medium"
-        else:
-            level = "Low"
-
-        risk_data.append(
-            {
-                "crime_type": r.crime_type,
-                "level": level
-            }
-        )
+        lat, lng = geo.center(r.cell)
+        cells.append({"geohash": r.cell, "lat": lat, "lng": lng, "count": int(r.count)})
+    return cells
+
+
+# -------------------------------------------------
+# 1) SUMMARY — reports count grouped by crime type
+# -------------------------------------------------
+def get_summary(db: Session, location_id: int, crime_type_id: int, range: str):
+    days = parse_range(range)
+
+    return [
+        {"crime_type": c["crime_type"], "count": c["recent"]}
+        for c in get_crime_type_counts(db, location_id, days)
+        if c["recent"] > 0 and (not crime_type_id or c["crime_type_id"] == crime_type_id)
+    ]
 
-    return risk_data
+
+# -------------------------------------------------
+# 2) RISK LEVELS — rate and percentile scoring (see core/risk.py)
+# -------------------------------------------------
+def get_risk_levels(db: Session, location_id: int):
+    return get_risk_matrix(db).for_location(location_id)
 
 
 # -------------------------------------------------
 # 3) RECENT REPORTS
 # -------------------------------------------------
 def get_recent_reports(db: Session, location_id: int, limit: int = 10):
+    return [
+        {
+            "crime_type": r["crime_type"],
+            "description": r["description"],
+            "time_ago": r["date_reported"].strftime("%Y-%m-%d %H:%M")
+        }
+        for r in get_recent_reports_for_locations(db, [location_id], limit)[location_id]
+    ]
+
+
+# -------------------------------------------------
+# 4) BATCH — many locations from a fixed number of grouped queries
+# -------------------------------------------------
+def get_summaries_for_locations(db: Session, location_ids: list, days: int, crime_type_id: int = None):
+    """Windowed non-zero counts per crime type for each of `location_ids`, in one query."""
+    query = (
+        db.query(
+            DailyCrimeCount.location_id.label("location_id"),
+            CrimeType.name.label("crime_type"),
+            func.sum(DailyCrimeCount.count).label("count"),
+        )
+        .join(CrimeType, CrimeType.crime_type_id == DailyCrimeCount.crime_type_id)
+        .filter(
+            DailyCrimeCount.location_id.in_(location_ids),
+            DailyCrimeCount.day >= window_start(days),
+        )
+    )
+    if crime_type_id:
+        query = query.filter(DailyCrimeCount.crime_type_id == crime_type_id)
+
     results = (
-        db.query(Report)
-        .filter(Report.location_id == location_id)
-        .order_by(desc(Report.created_at))
-        .limit(limit)
+        query.group_by(DailyCrimeCount.location_id, CrimeType.crime_type_id, CrimeType.name)
+        .having(func.sum(DailyCrimeCount.count) > 0)
+        .order_by(DailyCrimeCount.location_id, CrimeType.crime_type_id)
         .all()
     )
 
-    output = []
+    summaries = {loc_id: [] for loc_id in location_ids}
     for r in results:
-        output.append(
-            {
-                "crime_type": r.crime_type.name,
-                "description": r.description,
-                "time_ago": r.created_at.strftime("%Y-%m-%d %H:%M")
-            }
+        summaries[r.location_id].append({"crime_type": r.crime_type, "count": int(r.count)})
+    return summaries
+
+
+def get_recent_reports_for_locations(db: Session, location_ids: list, limit: int = 10):
+    """
+    The `limit` newest reports of each of `location_ids`, in one query
+    (ROW_NUMBER() per location instead of one LIMIT query per location).
+    """
+    rn = func.row_number().over(
+        partition_by=Report.location_id,
+        order_by=(Report.date_reported.desc(), Report.report_id.desc()),
+    ).label("rn")
+    ranked = (
+        db.query(
+            Report.location_id,
+            Report.crime_type_id,
+            Report.description,
+            Report.date_reported,
+            rn,
+        )
+        .filter(Report.location_id.in_(location_ids))
+        .subquery()
+    )
+
+    results = (
+        db.query(
+            ranked.c.location_id,
+            CrimeType.name.label("crime_type"),
+            ranked.c.description,
+            ranked.c.date_reported,
         )
+        .join(CrimeType, CrimeType.crime_type_id == ranked.c.crime_type_id)
+        .filter(ranked.c.rn <= limit)
+        .order_by(ranked.c.location_id, ranked.c.rn)
+        .all()
+    )
 
-    return output
+    recent = {loc_id: [] for loc_id in location_ids}
+    for r in results:
+        recent[r.location_id].append({
+            "crime_type": r.crime_type,
+            "description": r.description,
+            "date_reported": r.date_reported,
+        })
+    return recent
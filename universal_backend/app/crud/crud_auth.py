@@ -1,10 +1,16 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, and_
 from datetime import datetime, timedelta, timezone
 import secrets
+from typing import NamedTuple
 from ..models.sqlalchemy_models import Report, ReportAddon
 
-from ..models.sqlalchemy_models import ExternalOrg, Admin, Reporter, Session as DBSession
+from ..models.sqlalchemy_models import ExternalOrg, Admin, Reporter, Session as DBSession, RevokedToken
 from ..core.security import hash_password, verify_password
+from . import crud_rollups, crud_search
+from ..core.pagination import clamp_limit, encode_cursor, decode_cursor
+from ..core.cache import session_cache
+from ..core import session_tokens
 
 def get_org_by_email(db: Session, email: str):
     return db.query(ExternalOrg).filter(ExternalOrg.contact_email == email).first()
@@ -12,8 +18,9 @@ def get_org_by_email(db: Session, email: str):
 def get_org_by_id(db: Session, org_id: int):
     return db.query(ExternalOrg).filter(ExternalOrg.org_id == org_id).first()
 
-def create_org(db: Session, org_name: str, contact_person: str, contact_email: str, contact_phone: str, password: str):
-    hashed = hash_password(password)
+def create_org(db: Session, org_name: str, contact_person: str, contact_email: str, contact_phone: str, password: str = None, hashed_password: str = None):
+    # async callers hash on the worker pool and pass hashed_password instead
+    hashed = hashed_password or hash_password(password)
     org = ExternalOrg(
         org_name=org_name,
         contact_person=contact_person,
@@ -27,7 +34,7 @@ def create_org(db: Session, org_name: str, contact_person: str, contact_email: s
     db.refresh(org)
     return org
 
-def authenticate_org(db: Session, identifier: str, password: str):
+def get_org_by_identifier(db: Session, identifier: str):
     # identifier may be email or org id or name
     org = None
     if "@" in identifier:
@@ -40,7 +47,10 @@ def authenticate_org(db: Session, identifier: str, password: str):
         except Exception:
             # try by name
             org = db.query(ExternalOrg).filter(ExternalOrg.org_name == identifier).first()
+    return org
 
+def authenticate_org(db: Session, identifier: str, password: str):
+    org = get_org_by_identifier(db, identifier)
     if org and verify_password(password, org.password):
         return org
     return None
@@ -48,13 +58,16 @@ def authenticate_org(db: Session, identifier: str, password: str):
 def get_admin_by_id(db: Session, admin_id: int):
     return db.query(Admin).filter(Admin.admin_id == admin_id).first()
 
-def authenticate_admin(db: Session, admin_identifier: str, password: str):
+def get_admin_by_identifier(db: Session, admin_identifier: str):
     try:
         admin_id = int(admin_identifier)
-        admin = get_admin_by_id(db, admin_id)
+        return get_admin_by_id(db, admin_id)
     except Exception:
         # no other admin lookup implemented yet
-        admin = None
+        return None
+
+def authenticate_admin(db: Session, admin_identifier: str, password: str):
+    admin = get_admin_by_identifier(db, admin_identifier)
     if admin and verify_password(password, admin.password):
         return admin
     return None
@@ -71,6 +84,58 @@ def get_reporter_by_id(db: Session, reporter_id: int):
     """Fetch a reporter record by its ID."""
     return db.query(Reporter).filter(Reporter.reporter_id == reporter_id).first()
 
+REPORTER_SORTS = ("id", "reports")
+
+def list_reporters_with_counts(db: Session, sort: str = "id", limit: int = None, cursor: str = None):
+    """
+    One page of reporters with their report counts, from a single
+    outer join + COUNT + GROUP BY; rows are plain tuples, no Report objects
+    are loaded.
+
+    sort="id" pages by reporter_id ascending; sort="reports" pages by report
+    count descending (ties by reporter_id descending). Returns
+    (rows, next_cursor). Raises ValueError for an unknown sort or a cursor
+    that does not match it.
+    """
+    if sort not in REPORTER_SORTS:
+        raise ValueError(f"sort must be one of {REPORTER_SORTS}")
+    limit = clamp_limit(limit)
+    report_count = func.count(Report.report_id).label("report_count")
+    query = (
+        db.query(Reporter.reporter_id, Reporter.alias, Reporter.email, Reporter.phone, report_count)
+        .outerjoin(Report, Report.reporter_id == Reporter.reporter_id)
+        .group_by(Reporter.reporter_id, Reporter.alias, Reporter.email, Reporter.phone)
+    )
+
+    values = decode_cursor(cursor) if cursor else None
+    try:
+        if sort == "reports":
+            if values:
+                last_count, last_id = (int(v) for v in values)
+                query = query.having(or_(
+                    report_count < last_count,
+                    and_(report_count == last_count, Reporter.reporter_id < last_id),
+                ))
+            query = query.order_by(report_count.desc(), Reporter.reporter_id.desc())
+        else:
+            if values:
+                (last_id,) = (int(v) for v in values)
+                query = query.filter(Reporter.reporter_id > last_id)
+            query = query.order_by(Reporter.reporter_id)
+    except (TypeError, ValueError):
+        raise ValueError("invalid cursor")
+
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        if sort == "reports":
+            next_cursor = encode_cursor(last.report_count, last.reporter_id)
+        else:
+            next_cursor = encode_cursor(last.reporter_id)
+    return page, next_cursor
+
 def update_reporter(db: Session, reporter, alias=None, f_name=None, l_name=None, email=None, phone=None):
     """Update reporter details and save changes."""
     if alias is not None:
@@ -105,7 +170,14 @@ def authenticate_reporter(db: Session, identifier: str, password: str):
 
 # Session management helpers
 def create_session(db: Session, user_type: str, user_id: int, hours_valid: int = 24):
-    """Create a session token for the given user and persist it to the sessions table."""
+    """
+    Create a session token for the given user and persist it to the sessions
+    table. With SESSION_TOKEN_MODE=jwt a signed token is issued instead and
+    nothing is written.
+    """
+    if session_tokens.JWT_MODE:
+        token, _, _, expires_at = session_tokens.issue(user_type, user_id, hours_valid)
+        return CachedSession(None, user_type, user_id, token, expires_at)
     token = secrets.token_urlsafe(32)
     expires_at = datetime.utcnow() + timedelta(hours=hours_valid)
     sess = DBSession(user_type=user_type, user_id=user_id, token=token, expires_at=expires_at)
@@ -114,15 +186,46 @@ def create_session(db: Session, user_type: str, user_id: int, hours_valid: int =
     db.refresh(sess)
     return sess
 
+class CachedSession(NamedTuple):
+    """Detached copy of a session (session_id is None for signed tokens), safe to share between requests."""
+    session_id: int
+    user_type: str
+    user_id: int
+    token: str
+    expires_at: datetime
+
 def get_session_by_token(db: Session, token: str):
+    """
+    The live session for `token`, or None. Validated tokens are served from
+    session_cache until the session expires, so repeat requests do not
+    query the database to identify the caller.
+    """
     if not token:
         return None
+    if session_tokens.looks_signed(token):
+        claims = session_tokens.validate(token) if session_tokens.JWT_MODE else None
+        if not claims:
+            return None
+        return CachedSession(None, claims["user_type"], claims["user_id"], token, claims["expires_at"])
+    # Opaque tokens stay valid in jwt mode until they expire
     now = datetime.utcnow()
-    return db.query(DBSession).filter(DBSession.token == token, DBSession.expires_at > now).first()
+    cached = session_cache.get(token)
+    if cached is not None and cached.expires_at > now:
+        return cached
+    sess = db.query(DBSession).filter(DBSession.token == token, DBSession.expires_at > now).first()
+    if not sess:
+        return None
+    cached = CachedSession(sess.session_id, sess.user_type, sess.user_id, sess.token, sess.expires_at)
+    remaining = (sess.expires_at - now).total_seconds()
+    session_cache.set(token, cached, tags=[(sess.user_type, sess.user_id)], ttl=min(session_cache.ttl, remaining))
+    return cached
 
 def delete_session(db: Session, token: str):
     if not token:
         return False
+    if session_tokens.looks_signed(token):
+        return revoke_signed_token(db, token)
+    session_cache.delete(token)
     sess = db.query(DBSession).filter(DBSession.token == token).first()
     if not sess:
         return False
@@ -130,6 +233,81 @@ def delete_session(db: Session, token: str):
     db.commit()
     return True
 
+def _purge_expired(db: Session, model, id_column, batch_size: int, now: datetime) -> int:
+    # Ids are selected first because MySQL rejects LIMIT in a subquery on
+    # the table being deleted from.
+    ids = [
+        row_id
+        for (row_id,) in db.query(id_column)
+        .filter(model.expires_at <= now)
+        .order_by(model.expires_at)
+        .limit(batch_size)
+    ]
+    if not ids:
+        return 0
+    db.query(model).filter(id_column.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    return len(ids)
+
+def _end_user_sessions(db: Session, user_type: str, user_id: int):
+    """
+    Stage the removal of every session the user holds and, in jwt mode, the
+    revocation of every signed token issued to them so far. The caller
+    commits, then passes the return value on to _forget_user_sessions.
+    """
+    db.query(DBSession).filter(DBSession.user_type == user_type, DBSession.user_id == user_id).delete(synchronize_session=False)
+    return _revoke_user_tokens(db, user_type, user_id) if session_tokens.JWT_MODE else None
+
+def _forget_user_sessions(user_type: str, user_id: int, revoked_at: datetime = None):
+    """After the commit: stop accepting the user's sessions in this process."""
+    session_cache.invalidate_tags({(user_type, user_id)})
+    if revoked_at:
+        session_tokens.denylist.revoke_user(user_type, user_id, revoked_at)
+
+def purge_expired_sessions(db: Session, batch_size: int = 500, now: datetime = None) -> int:
+    """
+    Delete up to `batch_size` expired sessions, oldest first, and commit.
+    Returns the number of rows removed; callers loop until it is short of
+    batch_size.
+    """
+    return _purge_expired(db, DBSession, DBSession.session_id, batch_size, now or datetime.utcnow())
+
+# Signed-token revocation (SESSION_TOKEN_MODE=jwt)
+def revoke_signed_token(db: Session, token: str) -> bool:
+    """Denylist one signed token (logout). False if it is invalid or already expired."""
+    claims = session_tokens.decode(token) if session_tokens.JWT_MODE else None
+    if not claims:
+        return False
+    if not db.query(RevokedToken.revocation_id).filter(RevokedToken.jti == claims["jti"]).first():
+        db.add(RevokedToken(jti=claims["jti"], revoked_at=datetime.utcnow(), expires_at=claims["expires_at"]))
+        db.commit()
+    session_tokens.denylist.revoke_jti(claims["jti"], claims["expires_at"])
+    return True
+
+def _revoke_user_tokens(db: Session, user_type: str, user_id: int) -> datetime:
+    """Stage a revocation of every signed token issued to the user so far; the caller commits."""
+    now = datetime.utcnow()
+    db.add(RevokedToken(
+        user_type=user_type,
+        user_id=user_id,
+        revoked_at=now,
+        expires_at=now + timedelta(hours=session_tokens.SESSION_TOKEN_MAX_HOURS),
+    ))
+    return now
+
+def get_revocations(db: Session, after_id: int = 0):
+    """Unexpired revoked_tokens rows newer than `after_id`, oldest first."""
+    return (
+        db.query(RevokedToken)
+        .filter(RevokedToken.revocation_id > after_id, RevokedToken.expires_at > datetime.utcnow())
+        .order_by(RevokedToken.revocation_id)
+        .all()
+    )
+
+def purge_expired_revocations(db: Session, batch_size: int = 500, now: datetime = None) -> int:
+    """purge_expired_sessions for revoked_tokens rows whose tokens have all expired."""
+    return _purge_expired(db, RevokedToken, RevokedToken.revocation_id, batch_size, now or datetime.utcnow())
+
 def delete_reporter(db: Session, reporter_id: int, hard_delete: bool = False) -> bool:
     """
     Delete a reporter and related data.
@@ -142,13 +320,6 @@ def delete_reporter(db: Session, reporter_id: int, hard_delete: bool = False) ->
     if not rep:
         return False
 
-    # Delete sessions for this user (sessions table name/class DBSession used in your project)
-    try:
-        db.query(DBSession).filter(DBSession.user_type == "reporter", DBSession.user_id == reporter_id).delete(synchronize_session=False)
-    except Exception:
-        # If DBSession class/field names differ, adjust accordingly.
-        pass
-
     # Delete report addons first (files saved on disk are not removed here — you can remove them if you'd like)
     try:
         addons = db.query(ReportAddon).join(Report).filter(Report.reporter_id == reporter_id).all()
@@ -163,22 +334,46 @@ def delete_reporter(db: Session, reporter_id: int, hard_delete: bool = False) ->
     except Exception:
         pass
 
-    # Delete reports
+    # Delete reports, taking them out of the daily rollup and search index,
+    # then the reporter's sessions and row. All in one transaction: if any
+    # step fails the whole delete is rolled back, so the rollup and index
+    # never drift.
     try:
+        revoked_at = _end_user_sessions(db, "reporter", reporter_id)
+        crud_rollups.remove_reports(db, Report.reporter_id == reporter_id)
+        crud_search.unindex_reports(db, Report.reporter_id == reporter_id)
         db.query(Report).filter(Report.reporter_id == reporter_id).delete(synchronize_session=False)
-    except Exception:
-        pass
-
-    # Finally delete the reporter row
-    try:
         db.delete(rep)
         db.commit()
     except Exception as e:
         db.rollback()
         raise
+    _forget_user_sessions("reporter", reporter_id, revoked_at)
 
     return True
 
+def _delete_account(db: Session, user_type: str, user_id: int, account) -> bool:
+    """Delete an org or admin row together with its sessions and signed tokens."""
+    if not account:
+        return False
+    try:
+        revoked_at = _end_user_sessions(db, user_type, user_id)
+        db.delete(account)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    _forget_user_sessions(user_type, user_id, revoked_at)
+    return True
+
+def delete_org(db: Session, org_id: int) -> bool:
+    """Delete an organisation and end its sessions. Returns False if it does not exist."""
+    return _delete_account(db, "external_org", org_id, get_org_by_id(db, org_id))
+
+def delete_admin(db: Session, admin_id: int) -> bool:
+    """Delete an admin and end their sessions. Returns False if it does not exist."""
+    return _delete_account(db, "admin", admin_id, get_admin_by_id(db, admin_id))
+
 def create_admin(db: Session, password: str):
     """Create a new admin with only a password (hashed). Returns the created Admin model."""
     hashed = hash_password(password)
@@ -0,0 +1,63 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+
+from ..models.sqlalchemy_models import Reporter
+from ..core.security import hash_password_async, verify_password_async
+from . import crud_auth
+
+# Async counterparts of the crud_auth reporter helpers used by the mobile API.
+
+async def get_reporter_by_id(db: AsyncSession, reporter_id: int):
+    return await db.get(Reporter, reporter_id)
+
+async def get_reporter_by_alias(db: AsyncSession, alias: str):
+    result = await db.execute(select(Reporter).where(Reporter.alias == alias))
+    return result.scalars().first()
+
+async def create_reporter(db: AsyncSession, alias: str, password: str, email: str = None, phone: str = None):
+    hashed = await hash_password_async(password)
+    rep = Reporter(alias=alias, password=hashed, email=email, phone=phone)
+    db.add(rep)
+    await db.commit()
+    await db.refresh(rep)
+    return rep
+
+async def update_reporter(db: AsyncSession, reporter, alias=None, f_name=None, l_name=None, email=None, phone=None):
+    """Update reporter details and save changes."""
+    if alias is not None:
+        reporter.alias = alias
+    if f_name is not None:
+        reporter.f_name = f_name
+    if l_name is not None:
+        reporter.l_name = l_name
+    if email is not None:
+        reporter.email = email
+    if phone is not None:
+        reporter.phone = phone
+    db.add(reporter)
+    await db.commit()
+    await db.refresh(reporter)
+    return reporter
+
+async def authenticate_reporter(db: AsyncSession, identifier: str, password: str):
+    # identifier may be alias or email
+    column = Reporter.email if "@" in identifier else Reporter.alias
+    result = await db.execute(select(Reporter).where(column == identifier))
+    rep = result.scalars().first()
+    if rep and await verify_password_async(password, rep.password):
+        rep.last_login = datetime.now()
+        db.add(rep)
+        await db.commit()
+        await db.refresh(rep)
+        return rep
+    return None
+
+async def delete_reporter(db: AsyncSession, reporter_id: int) -> bool:
+    """
+    Delete a reporter and related data.
+
+    Runs the sync implementation on the session's greenlet so the bulk
+    deletes and rollup bookkeeping live in one place.
+    """
+    return await db.run_sync(crud_auth.delete_reporter, reporter_id)
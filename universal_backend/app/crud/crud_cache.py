@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import update, and_, or_
+from sqlalchemy.exc import IntegrityError
+
+from ..db.session import SessionLocal, BOOKKEEPING
+from ..models.sqlalchemy_models import AnalyticsCache
+from ..core.cache import analytics_cache, ALL_LOCATIONS
+
+# Bump when the shape of a cached payload changes so old rows are never read
+CACHE_FORMAT = 1
+
+# How long a computed result stays valid in the shared table
+SHARED_TTL = float(os.environ.get("ANALYTICS_SHARED_CACHE_TTL", "300"))
+# How long a worker trusts its in-process copy before re-checking the version
+LOCAL_TTL = float(os.environ.get("ANALYTICS_LOCAL_CACHE_TTL", "5"))
+# How long a worker may hold the recompute lease on an expired key
+LEASE_SECONDS = float(os.environ.get("ANALYTICS_CACHE_LEASE", "30"))
+# How long other workers wait for the leaseholder before computing themselves
+WAIT_SECONDS = float(os.environ.get("ANALYTICS_CACHE_WAIT", "5"))
+# How long an expired row is kept (and can be served stale) before the reaper deletes it
+PURGE_GRACE = float(os.environ.get("ANALYTICS_CACHE_PURGE_GRACE", "3600"))
+POLL_INTERVAL = 0.05
+
+counters = {
+    "shared_hits": 0,
+    "shared_misses": 0,
+    "recomputes": 0,
+    "stale_served": 0,
+    "lease_waits": 0,
+    "lease_timeouts": 0,
+}
+
+
+def query_hash(endpoint: str, params: dict) -> str:
+    raw = json.dumps({"f": CACHE_FORMAT, "e": endpoint, "p": params}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# -------------------------------------------------
+# INVALIDATION (runs inside the writer's transaction)
+# -------------------------------------------------
+def expire_locations_stmt(location_ids):
+    """Expire every live shared entry depending on `location_ids` or on all locations."""
+    now = datetime.utcnow()
+    return (
+        update(AnalyticsCache)
+        .where(
+            or_(
+                AnalyticsCache.location_id.in_(list(location_ids)),
+                AnalyticsCache.location_id.is_(None),
+            ),
+            AnalyticsCache.expires_at > now,
+        )
+        .values(expires_at=now)
+    )
+
+
+def purge_expired(db, batch_size: int = 500, now: datetime = None) -> int:
+    """
+    Delete up to `batch_size` rows expired for longer than PURGE_GRACE, or
+    never computed and no longer leased (a failed first computation), and
+    commit. Returns the number of rows removed; callers loop until it is
+    short of batch_size.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=PURGE_GRACE)
+    # Ids first: MySQL rejects LIMIT in a subquery on the table being deleted from
+    ids = [
+        cache_id
+        for (cache_id,) in db.query(AnalyticsCache.cache_id)
+        .filter(or_(
+            AnalyticsCache.expires_at < cutoff,
+            and_(
+                AnalyticsCache.expires_at.is_(None),
+                or_(AnalyticsCache.lease_until.is_(None), AnalyticsCache.lease_until < cutoff),
+            ),
+        ))
+        .limit(batch_size)
+    ]
+    if not ids:
+        return 0
+    db.query(AnalyticsCache).filter(AnalyticsCache.cache_id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    return len(ids)
+
+
+# -------------------------------------------------
+# LEASES
+# -------------------------------------------------
+def _claim(cdb, key: str, endpoint: str, params: dict, location_id, now: datetime) -> bool:
+    """Atomically take the recompute lease on `key`. Only one worker wins."""
+    lease_until = now + timedelta(seconds=LEASE_SECONDS)
+    result = cdb.execute(
+        update(AnalyticsCache)
+        .where(
+            AnalyticsCache.query_hash == key,
+            or_(AnalyticsCache.lease_until.is_(None), AnalyticsCache.lease_until < now),
+        )
+        .values(lease_until=lease_until)
+    )
+    if result.rowcount == 1:
+        cdb.commit()
+        return True
+
+    if cdb.query(AnalyticsCache.cache_id).filter(AnalyticsCache.query_hash == key).first():
+        cdb.rollback()
+        return False
+
+    # First computation of this key: the unique query_hash decides the winner
+    cdb.add(AnalyticsCache(
+        query_hash=key,
+        params={"endpoint": endpoint, **params},
+        location_id=location_id,
+        lease_until=lease_until,
+    ))
+    try:
+        cdb.commit()
+        return True
+    except IntegrityError:
+        cdb.rollback()
+        return False
+
+
+def _store(cdb, key: str, data, ttl: float):
+    now = datetime.utcnow()
+    cdb.execute(
+        update(AnalyticsCache)
+        .where(AnalyticsCache.query_hash == key)
+        .values(
+            data=data,
+            version=AnalyticsCache.version + 1,
+            generated_at=now,
+            expires_at=now + timedelta(seconds=ttl),
+            lease_until=None,
+        )
+    )
+    cdb.commit()
+    return cdb.query(AnalyticsCache.version).filter(AnalyticsCache.query_hash == key).scalar()
+
+
+def _release(cdb, key: str):
+    cdb.rollback()
+    cdb.execute(update(AnalyticsCache).where(AnalyticsCache.query_hash == key).values(lease_until=None))
+    cdb.commit()
+
+
+def _remember(key: str, version: int, data, location_id):
+    tags = [location_id] if location_id is not None else [ALL_LOCATIONS]
+    analytics_cache.set(key, (version, data, time.monotonic()), tags=tags)
+
+
+# -------------------------------------------------
+# READ-THROUGH
+# -------------------------------------------------
+def get_or_compute(endpoint: str, params: dict, compute, location_id: int = None, ttl: float = None):
+    """
+    Return the cached result of `endpoint` for `params`, computing it at most
+    once across all workers.
+
+    Lookup order: the in-process cache (trusted for LOCAL_TTL seconds), then
+    the shared analytics_cache table. On an expired or missing key a single
+    worker takes the lease and recomputes; the others serve the previous
+    value if there is one, or wait up to WAIT_SECONDS for the new one.
+
+    Every distinct `params` is a row in the shared table until the session
+    reaper purges it, so only use this for bounded key spaces (a day range,
+    a location id); results keyed by client-chosen values such as map
+    viewports belong in the in-process analytics_cache alone.
+    """
+    ttl = SHARED_TTL if ttl is None else ttl
+    key = query_hash(endpoint, params)
+
+    local = analytics_cache.get(key)
+    if local is not None and time.monotonic() - local[2] < LOCAL_TTL:
+        return local[1]
+
+    cdb = SessionLocal(info={BOOKKEEPING: True})
+    try:
+        now = datetime.utcnow()
+        row = (
+            cdb.query(AnalyticsCache.version, AnalyticsCache.expires_at)
+            .filter(AnalyticsCache.query_hash == key)
+            .first()
+        )
+        fresh = row is not None and row.expires_at is not None and row.expires_at > now
+
+        if fresh:
+            counters["shared_hits"] += 1
+            if local is not None and local[0] == row.version:
+                data = local[1]
+            else:
+                data = cdb.query(AnalyticsCache.data).filter(AnalyticsCache.query_hash == key).scalar()
+            _remember(key, row.version, data, location_id)
+            return data
+
+        counters["shared_misses"] += 1
+        if _claim(cdb, key, endpoint, params, location_id, now):
+            try:
+                data = compute()
+            except Exception:
+                _release(cdb, key)
+                raise
+            counters["recomputes"] += 1
+            version = _store(cdb, key, data, ttl)
+            _remember(key, version, data, location_id)
+            return data
+
+        # Another worker is recomputing: serve the previous value if we have one
+        stale = cdb.query(AnalyticsCache.data).filter(AnalyticsCache.query_hash == key).scalar()
+        if stale is not None:
+            counters["stale_served"] += 1
+            return stale
+
+        counters["lease_waits"] += 1
+        deadline = time.monotonic() + WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            cdb.rollback()
+            data = cdb.query(AnalyticsCache.data).filter(AnalyticsCache.query_hash == key).scalar()
+            if data is not None:
+                return data
+
+        counters["lease_timeouts"] += 1
+        return compute()
+    finally:
+        cdb.close()
+
+
+def stats() -> dict:
+    return {"local": analytics_cache.stats(), "shared": dict(counters)}
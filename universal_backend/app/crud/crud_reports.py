@@ -1,7 +1,10 @@
 # src/app/crud/crud_reports.py
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload, contains_eager
+from sqlalchemy import or_, and_
 from datetime import datetime
 from app.models import sqlalchemy_models as models
+from app.crud import crud_rollups, crud_search
+from app.core.pagination import clamp_limit, encode_cursor, decode_report_cursor
 
 def create_report(
     db: Session,
@@ -17,8 +20,13 @@ def create_report(
         location_id=location_id,
         description=description,
         occurrence_time=occurrence_time,
+        # set explicitly so the rollup bucket is known without a round trip
+        date_reported=datetime.utcnow(),
     )
     db.add(rpt)
+    crud_rollups.apply_deltas(db, [crud_rollups.report_delta(rpt, +1)])
+    db.flush()
+    crud_search.index_reports(db, models.Report.report_id == rpt.report_id)
     db.commit()
     db.refresh(rpt)
     return rpt
@@ -41,11 +49,105 @@ def add_report_addon(
     db.refresh(addon)
     return addon
 
-def get_all_reports(db: Session):
-    """Fetch all crime reports with reporter, crime type, and date info."""
-    return (
+def delete_report(db: Session, report: models.Report):
+    """Delete a report (and its addons) and remove it from the daily rollup and search index."""
+    crud_rollups.apply_deltas(db, [crud_rollups.report_delta(report, -1)])
+    crud_search.unindex_reports(db, models.Report.report_id == report.report_id)
+    db.delete(report)
+    db.commit()
+
+def get_reports_page(
+    db: Session,
+    limit: int = None,
+    cursor: str = None,
+    crime_type: str = None,
+    occurred_from: datetime = None,
+    occurred_to: datetime = None,
+):
+    """
+    One page of reports, newest first, keyset-paginated on
+    (date_reported, report_id) so every page costs the same however many
+    reports exist. Returns (reports, next_cursor); next_cursor is None on
+    the last page. Raises ValueError for a malformed cursor.
+    """
+    limit = clamp_limit(limit)
+    query = (
         db.query(models.Report)
         .join(models.Reporter)
         .join(models.CrimeType)
+        # rows are rendered with their reporter, crime type and location
+        .options(
+            contains_eager(models.Report.reporter),
+            contains_eager(models.Report.crime_type),
+            joinedload(models.Report.location),
+        )
+    )
+    if crime_type:
+        query = query.filter(models.CrimeType.name.ilike(f"%{crime_type}%"))
+    if occurred_from:
+        query = query.filter(models.Report.occurrence_time >= occurred_from)
+    if occurred_to:
+        query = query.filter(models.Report.occurrence_time <= occurred_to)
+    if cursor:
+        last_date, last_id = decode_report_cursor(cursor)
+        query = query.filter(or_(
+            models.Report.date_reported < last_date,
+            and_(models.Report.date_reported == last_date, models.Report.report_id < last_id),
+        ))
+
+    rows = (
+        query.order_by(models.Report.date_reported.desc(), models.Report.report_id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    reports = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = reports[-1]
+        next_cursor = encode_cursor(last.date_reported, last.report_id)
+    return reports, next_cursor
+
+def get_report_detail(db: Session, report_id: int):
+    """A report with its reporter, crime type, location and addons loaded up front."""
+    return (
+        db.query(models.Report)
+        .options(
+            joinedload(models.Report.reporter),
+            joinedload(models.Report.crime_type),
+            joinedload(models.Report.location),
+            selectinload(models.Report.addons),
+        )
+        .filter(models.Report.report_id == report_id)
+        .first()
+    )
+
+def get_reports_by_reporter(db: Session, reporter_id: int):
+    """A reporter's reports with crime type and location loaded in the same query."""
+    return (
+        db.query(models.Report)
+        .options(joinedload(models.Report.crime_type), joinedload(models.Report.location))
+        .filter(models.Report.reporter_id == reporter_id)
         .all()
-    )
\ No newline at end of file
+    )
+
+def get_reports_by_ids(db: Session, report_ids: list):
+    """Reports (with reporter, crime type and location) in the order of `report_ids`."""
+    if not report_ids:
+        return []
+    reports = (
+        db.query(models.Report)
+        .options(
+            joinedload(models.Report.reporter),
+            joinedload(models.Report.crime_type),
+            joinedload(models.Report.location),
+        )
+        .filter(models.Report.report_id.in_(report_ids))
+        .all()
+    )
+    by_id = {r.report_id: r for r in reports}
+    return [by_id[i] for i in report_ids if i in by_id]
+
+def get_all_reports(db: Session, limit: int = None, cursor: str = None):
+    """Fetch one page of crime reports with reporter, crime type, and date info."""
+    reports, _ = get_reports_page(db, limit=limit, cursor=cursor)
+    return reports
\ No newline at end of file
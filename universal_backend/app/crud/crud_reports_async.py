@@ -0,0 +1,209 @@
+# src/app/crud/crud_reports_async.py
+import os
+from sqlalchemy import select, insert, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from app.models import sqlalchemy_models as models
+from app.crud import crud_rollups, crud_search
+
+# Async counterparts of crud_reports for the mobile API.
+
+async def create_report(
+    db: AsyncSession,
+    reporter_id: int,
+    crime_type_id: int,
+    location_id: int,
+    description: str,
+    occurrence_time: datetime,
+):
+    rpt = models.Report(
+        reporter_id=reporter_id,
+        crime_type_id=crime_type_id,
+        location_id=location_id,
+        description=description,
+        occurrence_time=occurrence_time,
+        # set explicitly so the rollup bucket is known without a round trip
+        date_reported=datetime.utcnow(),
+    )
+    db.add(rpt)
+    delta = crud_rollups.report_delta(rpt, +1)
+    await db.run_sync(crud_rollups.apply_deltas, [delta])
+    await db.flush()
+    await db.run_sync(crud_search.index_reports, models.Report.report_id == rpt.report_id)
+    await db.commit()
+    await db.refresh(rpt)
+    return rpt
+
+async def get_report(db: AsyncSession, report_id: int):
+    return await db.get(models.Report, report_id)
+
+async def add_report_addon(
+    db: AsyncSession,
+    report_id: int,
+    file_path: str,
+    file_type: str,
+    file_size: int = None,
+):
+    addon = models.ReportAddon(
+        report_id=report_id,
+        file_path=file_path,
+        file_type=file_type,
+        file_size=file_size,
+    )
+    db.add(addon)
+    await db.commit()
+    await db.refresh(addon)
+    return addon
+
+async def get_crime_types(db: AsyncSession):
+    result = await db.execute(select(models.CrimeType))
+    return result.scalars().all()
+
+async def get_locations(db: AsyncSession):
+    result = await db.execute(select(models.Location))
+    return result.scalars().all()
+
+# -------------------------
+# Bulk ingestion (offline-queued mobile submissions)
+# -------------------------
+MAX_BULK_REPORTS = int(os.environ.get("MAX_BULK_REPORTS", "5000"))
+
+OCCURRENCE_TIME_FORMAT = "%d/%m/%Y %H:%M"
+
+_DESCRIPTION_LENGTH = models.Report.__table__.c.description.type.length
+
+
+def _parse_occurrence_time(value):
+    """Same 'DD/MM/YYYY HH:MM' format as POST /api/reports; ISO 8601 also accepted."""
+    if not isinstance(value, str):
+        raise ValueError
+    try:
+        return datetime.strptime(value, OCCURRENCE_TIME_FORMAT)
+    except ValueError:
+        return datetime.fromisoformat(value)
+
+
+def _validate_item(item) -> tuple:
+    """(row, errors) for one submitted report; row is None when errors is non-empty."""
+    if not isinstance(item, dict):
+        return None, ["report must be an object"]
+    errors = []
+    row = {}
+    for field in ("reporter_id", "crime_type_id", "location_id"):
+        value = item.get(field)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            errors.append(f"{field} is required")
+        elif isinstance(value, int) and not isinstance(value, bool):
+            row[field] = value
+        elif isinstance(value, float) and value.is_integer():
+            row[field] = int(value)
+        else:
+            try:
+                if not isinstance(value, str):
+                    raise ValueError(value)
+                row[field] = int(value)
+            except ValueError:
+                errors.append(f"{field} must be an integer")
+    description = item.get("description")
+    if not isinstance(description, str) or not description.strip():
+        errors.append("description is required")
+    elif len(description) > _DESCRIPTION_LENGTH:
+        errors.append(f"description is longer than {_DESCRIPTION_LENGTH} characters")
+    else:
+        row["description"] = description
+    try:
+        row["occurrence_time"] = _parse_occurrence_time(item.get("occurrence_time"))
+    except ValueError:
+        errors.append("occurrence_time must be 'DD/MM/YYYY HH:MM' or ISO 8601")
+    return (None, errors) if errors else (row, [])
+
+
+async def _existing_ids(db: AsyncSession, rows: list) -> dict:
+    """Which referenced reporters, crime types and locations exist — one round trip."""
+    lookups = (
+        ("reporter_id", models.Reporter.reporter_id),
+        ("crime_type_id", models.CrimeType.crime_type_id),
+        ("location_id", models.Location.location_id),
+    )
+    selects = [
+        select(literal(field).label("kind"), column.label("id")).where(column.in_({r[field] for r in rows}))
+        for field, column in lookups
+    ]
+    found = {field: set() for field, _ in lookups}
+    for kind, id_ in (await db.execute(union_all(*selects))).all():
+        found[kind].add(id_)
+    return found
+
+
+_ROW_KEY = ("reporter_id", "crime_type_id", "location_id", "occurrence_time", "description")
+
+
+async def _insert_returning_ids(db: AsyncSession, values: list) -> list:
+    """
+    Batched multi-row INSERT ... RETURNING; ids are matched back to `values`
+    by content because RETURNING row order is not guaranteed (asking for
+    parameter order makes SQLite fall back to one INSERT per row).
+    """
+    columns = [models.Report.report_id] + [getattr(models.Report, k) for k in _ROW_KEY]
+    returned = await db.execute(insert(models.Report).returning(*columns), values)
+    ids = {}
+    for row in returned.all():
+        ids.setdefault(tuple(row[1:]), []).append(row[0])
+    return [ids[tuple(v[k] for k in _ROW_KEY)].pop() for v in values]
+
+
+async def create_reports_bulk(db: AsyncSession, items: list) -> list:
+    """
+    Validate and insert many reports in one transaction.
+
+    Items are checked together; every reporter, crime type and location they
+    reference is looked up in a single query. Valid items go in with one
+    multi-row INSERT, their rollup deltas are applied once, and everything
+    is committed once. Returns one result per item, in order:
+    {"index", "status": "created", "report_id"} or {"index", "status":
+    "rejected", "errors"}. report_id is None on backends without
+    INSERT ... RETURNING (MySQL).
+    """
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        row, errors = _validate_item(item)
+        results.append({"index": index, "status": "rejected", "errors": errors} if errors else None)
+        if row:
+            rows.append((index, row))
+
+    if rows:
+        found = await _existing_ids(db, [row for _, row in rows])
+        valid = []
+        for index, row in rows:
+            missing = [f"{field} {row[field]} does not exist" for field in found if row[field] not in found[field]]
+            if missing:
+                results[index] = {"index": index, "status": "rejected", "errors": missing}
+            else:
+                valid.append((index, row))
+        rows = valid
+
+    if rows:
+        now = datetime.utcnow()
+        values = [dict(row, date_reported=now) for _, row in rows]
+        if db.get_bind().dialect.insert_executemany_returning:
+            report_ids = await _insert_returning_ids(db, values)
+        else:
+            await db.execute(insert(models.Report), values)
+            report_ids = [None] * len(values)
+
+        deltas = [
+            {"location_id": v["location_id"], "crime_type_id": v["crime_type_id"], "day": now.date(), "count": 1}
+            for v in values
+        ]
+        await db.run_sync(crud_rollups.apply_deltas, deltas)
+        await db.run_sync(
+            crud_search.index_reports,
+            models.Report.date_reported == now,
+            models.Report.reporter_id.in_({v["reporter_id"] for v in values}),
+        )
+        await db.commit()
+        for (index, _), report_id in zip(rows, report_ids):
+            results[index] = {"index": index, "status": "created", "report_id": report_id}
+
+    return results
@@ -0,0 +1,184 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, update, delete, event
+from datetime import datetime, timedelta, date
+
+from ..models.sqlalchemy_models import Report, DailyCrimeCount
+from ..core.cache import invalidate_locations, invalidate_closed_buckets
+from .crud_cache import expire_locations_stmt
+
+# Session.info key collecting the locations whose counts changed in the
+# current transaction; cached analytics for them are dropped on commit.
+TOUCHED_LOCATIONS = "rollup_touched_locations"
+# Locations that lost reports in the current transaction (closed trend
+# buckets may have changed)
+REMOVED_FROM_LOCATIONS = "rollup_removed_locations"
+
+
+# -------------------------------------------------
+# WINDOWS
+# -------------------------------------------------
+def window_start(days: int) -> date:
+    """First rollup day covered by a "last `days` days" window."""
+    return (datetime.utcnow() - timedelta(days=days)).date()
+
+
+# -------------------------------------------------
+# INCREMENTAL MAINTENANCE
+# -------------------------------------------------
+def _upsert_stmt(dialect_name: str, rows: list):
+    """
+    Build a multi-row "add `count` to the existing bucket" statement, or
+    None when the dialect has no native upsert.
+    """
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(DailyCrimeCount).values(rows)
+        return stmt.on_duplicate_key_update(count=DailyCrimeCount.count + stmt.inserted["count"])
+    else:
+        return None
+
+    stmt = dialect_insert(DailyCrimeCount).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["location_id", "crime_type_id", "day"],
+        set_={"count": DailyCrimeCount.count + stmt.excluded["count"]},
+    )
+
+
+def _merge_deltas(deltas: list) -> list:
+    merged = {}
+    for d in deltas:
+        key = (d["location_id"], d["crime_type_id"], d["day"])
+        merged[key] = merged.get(key, 0) + d["count"]
+    return [
+        {"location_id": loc, "crime_type_id": ct, "day": day, "count": count}
+        for (loc, ct, day), count in merged.items()
+        if count != 0
+    ]
+
+
+def apply_deltas(db: Session, deltas: list):
+    """
+    Add each {location_id, crime_type_id, day, count} delta to its bucket.
+    Runs inside the caller's transaction; nothing is committed here.
+    """
+    rows = _merge_deltas(deltas)
+    if not rows:
+        return
+
+    touched = {r["location_id"] for r in rows}
+    db.info.setdefault(TOUCHED_LOCATIONS, set()).update(touched)
+    db.info.setdefault(REMOVED_FROM_LOCATIONS, set()).update(
+        r["location_id"] for r in rows if r["count"] < 0
+    )
+    # Expire the shared (cross-worker) cache entries atomically with the write
+    db.execute(expire_locations_stmt(touched))
+
+    stmt = _upsert_stmt(db.get_bind().dialect.name, rows)
+    if stmt is not None:
+        db.execute(stmt)
+    else:
+        for r in rows:
+            result = db.execute(
+                update(DailyCrimeCount)
+                .where(
+                    DailyCrimeCount.location_id == r["location_id"],
+                    DailyCrimeCount.crime_type_id == r["crime_type_id"],
+                    DailyCrimeCount.day == r["day"],
+                )
+                .values(count=DailyCrimeCount.count + r["count"])
+            )
+            if result.rowcount == 0:
+                db.execute(insert(DailyCrimeCount).values(**r))
+
+    if any(r["count"] < 0 for r in rows):
+        db.execute(delete(DailyCrimeCount).where(DailyCrimeCount.count <= 0))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cached_analytics(session):
+    touched = session.info.pop(TOUCHED_LOCATIONS, None)
+    if touched:
+        invalidate_locations(touched)
+    removed = session.info.pop(REMOVED_FROM_LOCATIONS, None)
+    if removed:
+        invalidate_closed_buckets(removed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_touched_locations(session):
+    session.info.pop(TOUCHED_LOCATIONS, None)
+    session.info.pop(REMOVED_FROM_LOCATIONS, None)
+
+
+def report_delta(report: Report, delta: int = 1) -> dict:
+    return {
+        "location_id": report.location_id,
+        "crime_type_id": report.crime_type_id,
+        "day": report.date_reported.date(),
+        "count": delta,
+    }
+
+
+def remove_reports(db: Session, *criteria):
+    """
+    Subtract every report matching `criteria` from the rollup. Call this
+    before the reports are deleted, inside the same transaction.
+    """
+    day = func.date(Report.date_reported)
+    results = (
+        db.query(
+            Report.location_id,
+            Report.crime_type_id,
+            day.label("day"),
+            func.count(Report.report_id).label("count"),
+        )
+        .filter(*criteria)
+        .group_by(Report.location_id, Report.crime_type_id, day)
+        .all()
+    )
+
+    apply_deltas(db, [
+        {
+            "location_id": r.location_id,
+            "crime_type_id": r.crime_type_id,
+            "day": _as_date(r.day),
+            "count": -int(r.count),
+        }
+        for r in results
+    ])
+
+
+def _as_date(value) -> date:
+    # SQLite returns DATE() as a string, MySQL as a date
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+# -------------------------------------------------
+# REBUILD / BACKFILL
+# -------------------------------------------------
+def rebuild_daily_counts(db: Session) -> int:
+    """Recompute the whole rollup from the reports table. Returns the row count."""
+    day = func.date(Report.date_reported)
+    db.execute(delete(DailyCrimeCount))
+    db.execute(
+        insert(DailyCrimeCount).from_select(
+            ["location_id", "crime_type_id", "day", "count"],
+            db.query(
+                Report.location_id,
+                Report.crime_type_id,
+                day,
+                func.count(Report.report_id),
+            )
+            .filter(Report.date_reported.isnot(None))
+            .group_by(Report.location_id, Report.crime_type_id, day)
+            .statement,
+        )
+    )
+    db.commit()
+    return db.query(DailyCrimeCount).count()
@@ -0,0 +1,183 @@
+import re
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, delete, exists, func, text, table, column, literal_column
+from sqlalchemy.dialects.mysql import match as mysql_match
+
+from ..models.sqlalchemy_models import Report, CrimeType, Location
+from ..core.pagination import clamp_limit, encode_cursor, decode_cursor
+
+# Full-text index over report description, crime type and location names.
+# SQLite: an FTS5 table keyed by rowid = report_id, ranked with bm25().
+# MySQL: a plain InnoDB table with a FULLTEXT key, ranked with MATCH().
+# Other backends have no index; search falls back to a LIKE scan.
+SEARCH_TABLE = "report_search"
+
+_SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    "USING fts5(description, crime_type, location, tokenize='porter unicode61')"
+)
+_MYSQL_DDL = f"""
+CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+    report_id INT NOT NULL PRIMARY KEY,
+    description TEXT,
+    crime_type VARCHAR(100),
+    location VARCHAR(401),
+    FULLTEXT KEY ft_{SEARCH_TABLE} (description, crime_type, location)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+_MAX_TERMS = 16
+
+
+def _backend(db: Session) -> str:
+    name = db.get_bind().dialect.name
+    if name == "sqlite":
+        return "sqlite"
+    if name in ("mysql", "mariadb"):
+        return "mysql"
+    return "none"
+
+
+def _search_table(backend: str):
+    """Table clause for the index; FTS5 keys rows by its implicit rowid."""
+    id_name = "rowid" if backend == "sqlite" else "report_id"
+    tbl = table(SEARCH_TABLE, column(id_name), column("description"), column("crime_type"), column("location"))
+    return tbl, tbl.c[id_name]
+
+
+def create_index(db: Session):
+    """Create the search table for this backend (no-op where unsupported)."""
+    backend = _backend(db)
+    if backend == "sqlite":
+        db.execute(text(_SQLITE_DDL))
+    elif backend == "mysql":
+        db.execute(text(_MYSQL_DDL))
+
+
+# -------------------------------------------------
+# KEEPING THE INDEX IN SYNC — run inside the writer's transaction
+# -------------------------------------------------
+def index_reports(db: Session, *criteria):
+    """
+    Add every report matching `criteria` that is not indexed yet, in one
+    INSERT ... SELECT. Call after the reports are flushed.
+    """
+    backend = _backend(db)
+    if backend == "none":
+        return
+    tbl, id_col = _search_table(backend)
+    rows = (
+        select(
+            Report.report_id,
+            Report.description,
+            CrimeType.name,
+            Location.area + " " + func.coalesce(Location.sub_area, ""),
+        )
+        .join(CrimeType, CrimeType.crime_type_id == Report.crime_type_id)
+        .join(Location, Location.location_id == Report.location_id)
+        .where(*criteria)
+        .where(~exists().where(id_col == Report.report_id))
+    )
+    db.execute(insert(tbl).from_select([id_col.name, "description", "crime_type", "location"], rows))
+
+
+def unindex_reports(db: Session, *criteria):
+    """Drop every report matching `criteria` from the index. Call before they are deleted."""
+    backend = _backend(db)
+    if backend == "none":
+        return
+    tbl, id_col = _search_table(backend)
+    db.execute(delete(tbl).where(id_col.in_(select(Report.report_id).where(*criteria))))
+
+
+# -------------------------------------------------
+# RANKED SEARCH
+# -------------------------------------------------
+def search_terms(q: str) -> list:
+    return re.findall(r"\w+", q or "")[:_MAX_TERMS]
+
+
+def _match_query(backend: str, terms: list) -> str:
+    # Every term must match; the last one also as a prefix (search-as-you-type).
+    # Terms are quoted so user input never reaches the query syntax.
+    if backend == "sqlite":
+        quoted = [f'"{t}"' for t in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+    return " ".join(f"+{t}" for t in terms[:-1]) + f" +{terms[-1]}*"
+
+
+def search_reports(
+    db: Session,
+    q: str,
+    limit: int = None,
+    cursor: str = None,
+    crime_type: str = None,
+    occurred_from=None,
+    occurred_to=None,
+):
+    """
+    Report ids matching keyword query `q`, best match first, as
+    [(report_id, score)] plus next_cursor (None on the last page). Higher
+    scores are better. Raises ValueError for a malformed cursor.
+    """
+    limit = clamp_limit(limit)
+    offset = 0
+    if cursor:
+        try:
+            (offset,) = (int(v) for v in decode_cursor(cursor))
+        except (TypeError, ValueError):
+            raise ValueError("invalid cursor")
+    terms = search_terms(q)
+    if not terms:
+        return [], None
+
+    backend = _backend(db)
+    if backend == "none":
+        like = [Report.description.ilike(f"%{t}%") for t in terms]
+        query = select(Report.report_id, literal_column("0").label("score")).where(*like)
+        order = [Report.date_reported.desc(), Report.report_id.desc()]
+    else:
+        tbl, id_col = _search_table(backend)
+        match = _match_query(backend, terms)
+        if backend == "sqlite":
+            # bm25() is lower-is-better
+            score = (-func.bm25(literal_column(SEARCH_TABLE))).label("score")
+            condition = literal_column(SEARCH_TABLE).op("MATCH")(match)
+        else:
+            relevance = mysql_match(tbl.c.description, tbl.c.crime_type, tbl.c.location, against=match)
+            condition = relevance.in_boolean_mode()
+            score = condition.label("score")
+        query = (
+            select(id_col.label("report_id"), score)
+            .select_from(tbl)
+            .join(Report, Report.report_id == id_col)
+            .where(condition)
+        )
+        order = [literal_column("score").desc(), id_col.desc()]
+
+    if crime_type:
+        query = query.join(CrimeType, CrimeType.crime_type_id == Report.crime_type_id)
+        query = query.where(CrimeType.name.ilike(f"%{crime_type}%"))
+    if occurred_from:
+        query = query.where(Report.occurrence_time >= occurred_from)
+    if occurred_to:
+        query = query.where(Report.occurrence_time <= occurred_to)
+
+    rows = db.execute(query.order_by(*order).limit(limit + 1).offset(offset)).all()
+    page = [(r.report_id, float(r.score)) for r in rows[:limit]]
+    next_cursor = encode_cursor(offset + limit) if len(rows) > limit else None
+    return page, next_cursor
+
+
+def rebuild_index(db: Session) -> int:
+    """Recreate the index from the reports table; returns the number of rows indexed."""
+    backend = _backend(db)
+    if backend == "none":
+        return 0
+    create_index(db)
+    tbl, _ = _search_table(backend)
+    db.execute(delete(tbl))
+    index_reports(db)
+    db.commit()
+    return db.execute(select(func.count()).select_from(tbl)).scalar()
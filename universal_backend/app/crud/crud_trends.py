@@ -0,0 +1,152 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from ..models.sqlalchemy_models import Report, DailyCrimeCount
+from ..core.cache import trend_cache, ALL_LOCATIONS
+
+GRANULARITIES = ("hour", "day", "week")
+
+# Hourly buckets are counted from the reports table, so keep their window short
+MAX_HOURLY_DAYS = 31
+
+_lock = threading.Lock()
+
+
+# -------------------------------------------------
+# BUCKET BOUNDARIES
+# -------------------------------------------------
+def bucket_start(granularity: str, when: datetime) -> datetime:
+    if granularity == "hour":
+        return when.replace(minute=0, second=0, microsecond=0)
+    day = datetime(when.year, when.month, when.day)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _format_bucket(granularity: str, start: datetime) -> str:
+    if granularity == "hour":
+        return start.strftime("%Y-%m-%dT%H:00")
+    return start.date().isoformat()
+
+
+# -------------------------------------------------
+# BUCKET QUERIES — counts per bucket from `start` onward
+# -------------------------------------------------
+def _hour_expr(db: Session):
+    name = db.get_bind().dialect.name
+    if name == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00", Report.date_reported)
+    if name in ("mysql", "mariadb"):
+        return func.date_format(Report.date_reported, "%Y-%m-%d %H:00:00")
+    return func.date_trunc("hour", Report.date_reported)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value
+    return datetime(value.year, value.month, value.day)
+
+
+def _count_hours(db: Session, start: datetime, location_id, crime_type_id) -> dict:
+    hour = _hour_expr(db)
+    query = (
+        db.query(hour.label("bucket"), func.count(Report.report_id).label("count"))
+        .filter(Report.date_reported >= start)
+    )
+    if location_id:
+        query = query.filter(Report.location_id == location_id)
+    if crime_type_id:
+        query = query.filter(Report.crime_type_id == crime_type_id)
+
+    return {_as_datetime(r.bucket): int(r.count) for r in query.group_by(hour).all()}
+
+
+def _count_days(db: Session, start: datetime, location_id, crime_type_id) -> dict:
+    query = (
+        db.query(DailyCrimeCount.day.label("bucket"), func.sum(DailyCrimeCount.count).label("count"))
+        .filter(DailyCrimeCount.day >= start.date())
+    )
+    if location_id:
+        query = query.filter(DailyCrimeCount.location_id == location_id)
+    if crime_type_id:
+        query = query.filter(DailyCrimeCount.crime_type_id == crime_type_id)
+
+    return {_as_datetime(r.bucket): int(r.count) for r in query.group_by(DailyCrimeCount.day).all()}
+
+
+def _count_weeks(db: Session, start: datetime, location_id, crime_type_id) -> dict:
+    weeks = {}
+    for day, count in _count_days(db, start, location_id, crime_type_id).items():
+        week = bucket_start("week", day)
+        weeks[week] = weeks.get(week, 0) + count
+    return weeks
+
+
+_COUNTERS = {"hour": _count_hours, "day": _count_days, "week": _count_weeks}
+
+
+# -------------------------------------------------
+# CLOSED-BUCKET CACHE
+# -------------------------------------------------
+class _Series:
+    """Counts of the closed buckets in [start, closed_until) for one trend key."""
+
+    def __init__(self, start: datetime, closed_until: datetime, counts: dict):
+        self.start = start
+        self.closed_until = closed_until
+        self.counts = counts
+
+
+def get_trend(db: Session, granularity: str, days: int, location_id: int = None, crime_type_id: int = None):
+    """
+    Report counts per hour/day/week over the last `days` days.
+
+    Closed buckets are cached per (granularity, location_id, crime_type_id);
+    after warm-up a call only queries the open bucket, plus any bucket that
+    closed since the previous call.
+    """
+    if granularity not in _COUNTERS:
+        raise ValueError(f"granularity must be one of {GRANULARITIES}")
+    count = _COUNTERS[granularity]
+
+    now = datetime.utcnow()
+    since = bucket_start(granularity, now - timedelta(days=days))
+    open_start = bucket_start(granularity, now)
+
+    key = ("trend", granularity, location_id, crime_type_id)
+    tags = [location_id] if location_id else [ALL_LOCATIONS]
+    series = trend_cache.get(key)
+
+    if series is None or series.start > since:
+        # Cold (or a longer window than cached): one query over the window
+        fetched = count(db, since, location_id, crime_type_id)
+        closed = {b: c for b, c in fetched.items() if b < open_start}
+        series = _Series(since, open_start, closed)
+        trend_cache.set(key, series, tags=tags)
+        open_count = fetched.get(open_start, 0)
+    else:
+        # Warm: buckets up to closed_until are final; fetch only what follows
+        fetched = count(db, series.closed_until, location_id, crime_type_id)
+        with _lock:
+            for b, c in fetched.items():
+                if b < open_start:
+                    series.counts[b] = c
+            series.closed_until = max(series.closed_until, open_start)
+        open_count = fetched.get(open_start, 0)
+
+    with _lock:
+        closed = sorted(series.counts.items())
+    trend = [
+        {"date": _format_bucket(granularity, b), "count": c}
+        for b, c in closed
+        if b >= since and c > 0
+    ]
+    if open_count > 0:
+        trend.append({"date": _format_bucket(granularity, open_start), "count": open_count})
+    return trend
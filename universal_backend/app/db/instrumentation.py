@@ -0,0 +1,164 @@
+# instrumentation.py — per-request SQL accounting hooked on engine events.
+#
+# Every statement run while a request is in flight is charged to that
+# request: statement count, total DB time and the slowest statement. The
+# HTTP middleware in main.py opens the request scope and folds the result
+# into per-route totals. Statements slower than SLOW_QUERY_MS are logged
+# with their parameters and the database's plan.
+import os
+import time
+import logging
+import threading
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.db.query_plans import explain
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+
+# Adds X-DB-* headers to every response and registers the /api/debug/*
+# and /api/analytics/cache/stats endpoints. Leave it off in production:
+# they expose query text, timings and internal state without auth.
+SQL_DEBUG = os.environ.get("SQL_DEBUG", "").lower() in ("1", "true", "yes", "on")
+
+_START_KEY = "instrumentation_start"
+_EXPLAINING_KEY = "instrumentation_explaining"
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_time", "slowest", "slowest_statement")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement: str, elapsed: float):
+        self.statements += 1
+        self.db_time += elapsed
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+
+    def headers(self) -> dict:
+        return {
+            "X-DB-Statements": str(self.statements),
+            "X-DB-Time-ms": f"{self.db_time * 1000:.1f}",
+            "X-DB-Slowest-ms": f"{self.slowest * 1000:.1f}",
+        }
+
+
+_current: ContextVar = ContextVar("request_sql_stats", default=None)
+
+
+def begin_request() -> tuple:
+    """Start charging statements to a fresh RequestStats; returns (stats, token)."""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+# ----------------------------
+# Engine events
+# ----------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if conn.info.get(_EXPLAINING_KEY):
+        return
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        _log_slow(conn, statement, parameters, elapsed, executemany)
+
+
+def _log_slow(conn, statement, parameters, elapsed, executemany):
+    plan = []
+    if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        conn.info[_EXPLAINING_KEY] = True
+        try:
+            plan = explain(conn, statement, parameters)
+        except Exception as exc:
+            plan = [f"(EXPLAIN failed: {exc})"]
+        finally:
+            conn.info[_EXPLAINING_KEY] = False
+    logger.warning(
+        "Slow query (%.1f ms): %s\n  parameters: %r%s",
+        elapsed * 1000,
+        " ".join(statement.split()),
+        parameters,
+        "".join(f"\n  -> {line}" for line in plan),
+    )
+
+
+def install(engine):
+    """Hook the accounting events on a sync engine (or an async engine's sync_engine)."""
+    engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ----------------------------
+# Per-route totals
+# ----------------------------
+_routes = {}
+_lock = threading.Lock()
+
+
+def record_route(route: str, stats: RequestStats):
+    with _lock:
+        totals = _routes.setdefault(route, {
+            "requests": 0,
+            "statements": 0,
+            "db_time": 0.0,
+            "max_statements": 0,
+            "slowest": 0.0,
+            "slowest_statement": None,
+        })
+        totals["requests"] += 1
+        totals["statements"] += stats.statements
+        totals["db_time"] += stats.db_time
+        totals["max_statements"] = max(totals["max_statements"], stats.statements)
+        if stats.slowest > totals["slowest"]:
+            totals["slowest"] = stats.slowest
+            totals["slowest_statement"] = stats.slowest_statement
+
+
+def route_stats() -> dict:
+    """Per-route totals, busiest (by total DB time) first."""
+    with _lock:
+        items = sorted(_routes.items(), key=lambda kv: kv[1]["db_time"], reverse=True)
+        return {
+            route: {
+                "requests": t["requests"],
+                "statements": t["statements"],
+                "avg_statements": round(t["statements"] / t["requests"], 2),
+                "max_statements": t["max_statements"],
+                "db_time_ms": round(t["db_time"] * 1000, 1),
+                "avg_db_time_ms": round(t["db_time"] * 1000 / t["requests"], 2),
+                "slowest_ms": round(t["slowest"] * 1000, 1),
+                "slowest_statement": t["slowest_statement"] and " ".join(t["slowest_statement"].split())[:300],
+            }
+            for route, t in items
+        }
+
+
+def reset_route_stats():
+    with _lock:
+        _routes.clear()
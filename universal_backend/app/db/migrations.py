@@ -0,0 +1,155 @@
+# migrations.py — versioned schema migrations for databases created by
+# earlier releases (Base.metadata.create_all never alters existing tables).
+#
+# Run from universal_backend/:
+#   python -m app.db.migrations            # apply pending migrations
+#   python -m app.db.migrations status     # show applied / pending versions
+import os
+import sys
+
+from sqlalchemy import inspect, text, func
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import engine as default_engine
+from app.models.sqlalchemy_models import (
+    Base, Location, Report, ReportAddon, Session as DBSession,
+    DailyCrimeCount, SchemaVersion, RevokedToken, AnalyticsCache,
+)
+from app.crud.crud_rollups import rebuild_daily_counts
+from app.crud import crud_search
+
+
+def _add_missing_columns(db, table: str, columns):
+    existing = {c["name"] for c in inspect(db.get_bind()).get_columns(table)}
+    for name, ddl in columns:
+        if name not in existing:
+            db.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def _create_indexes(db, model):
+    for index in model.__table__.indexes:
+        index.create(bind=db.get_bind(), checkfirst=True)
+
+
+# ----------------------------
+# Migrations
+# ----------------------------
+def _m001_location_coordinates(db):
+    _add_missing_columns(db, "locations", (("lat", "FLOAT"), ("lng", "FLOAT"), ("geohash", "VARCHAR(12)")))
+    db.commit()
+    _create_indexes(db, Location)
+    for loc in db.query(Location).filter(Location.geohash.is_(None)).all():
+        loc.sync_coordinates()
+
+
+def _m002_query_indexes(db):
+    for model in (Report, DBSession, ReportAddon, DailyCrimeCount):
+        _create_indexes(db, model)
+
+
+def _m003_backfill_rollups(db):
+    if db.query(DailyCrimeCount).first() is None and db.query(func.count(Report.report_id)).scalar():
+        rebuild_daily_counts(db)
+
+
+def _m004_report_search(db):
+    crud_search.create_index(db)
+    crud_search.index_reports(db)
+
+
+def _m005_session_expiry_index(db):
+    _create_indexes(db, DBSession)
+
+
+def _m006_revoked_tokens(db):
+    RevokedToken.__table__.create(bind=db.get_bind(), checkfirst=True)
+
+
+def _m007_analytics_cache_expiry_index(db):
+    AnalyticsCache.__table__.create(bind=db.get_bind(), checkfirst=True)
+    _create_indexes(db, AnalyticsCache)
+
+
+MIGRATIONS = [
+    (1, "numeric coordinates and geohash on locations", _m001_location_coordinates),
+    (2, "query-serving indexes on reports, sessions and report_addons", _m002_query_indexes),
+    (3, "backfill daily_crime_counts rollup", _m003_backfill_rollups),
+    (4, "full-text search index over reports", _m004_report_search),
+    (5, "index on sessions.expires_at for the expired-session reaper", _m005_session_expiry_index),
+    (6, "revoked_tokens denylist for signed session tokens", _m006_revoked_tokens),
+    (7, "index on analytics_cache.expires_at for the cache purge", _m007_analytics_cache_expiry_index),
+]
+
+HEAD = MIGRATIONS[-1][0]
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+def current_version(engine=default_engine) -> int:
+    if not inspect(engine).has_table(SchemaVersion.__tablename__):
+        return 0
+    with engine.connect() as conn:
+        return conn.execute(func.max(SchemaVersion.version).select()).scalar() or 0
+
+
+def upgrade(engine=default_engine) -> list:
+    """Create missing tables, then apply every pending migration in order."""
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    applied = []
+    try:
+        version = current_version(engine)
+        for number, description, migrate in MIGRATIONS:
+            if number <= version:
+                continue
+            migrate(db)
+            db.add(SchemaVersion(version=number, description=description))
+            db.commit()
+            applied.append((number, description))
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return applied
+
+
+def ensure_schema(engine=default_engine) -> int:
+    """
+    Startup check: one catalog lookup plus one SELECT on an up-to-date schema.
+
+    An empty database is created at head. A database behind head fails fast
+    unless SCHEMA_AUTO_UPGRADE is set, in which case it is upgraded.
+    """
+    version = current_version(engine)
+    if version == HEAD:
+        return version
+    if version > HEAD:
+        raise RuntimeError(
+            f"Database schema is at version {version}, newer than this release (head {HEAD})."
+        )
+    empty = not inspect(engine).get_table_names()
+    if empty or os.environ.get("SCHEMA_AUTO_UPGRADE", "").lower() in ("1", "true", "yes"):
+        upgrade(engine)
+        return current_version(engine)
+    raise RuntimeError(
+        f"Database schema is at version {version}, expected {HEAD}. "
+        "Run `python -m app.db.migrations` from universal_backend/ to upgrade it."
+    )
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if command == "status":
+        version = current_version()
+        for number, description, _ in MIGRATIONS:
+            state = "applied" if number <= version else "pending"
+            print(f"{number:>4}  {state:<8} {description}")
+    elif command == "upgrade":
+        applied = upgrade()
+        for number, description in applied:
+            print(f"🔧 Applied migration {number}: {description}")
+        print(f"✅ Schema at version {current_version()} (head {HEAD}).")
+    else:
+        sys.exit(f"Unknown command {command!r}; use 'upgrade' or 'status'.")
@@ -0,0 +1,171 @@
+# query_plans.py — print the database's plan for every hot query, so a
+# missing index (a full scan of reports or sessions) is visible at a glance,
+# and check that the rendered views stay within their SQL statement budgets
+# (an N+1 lazy load shows up as a blown budget).
+#
+# Run from universal_backend/:
+#   python -m app.db.query_plans            # print query plans
+#   python -m app.db.query_plans budgets    # exit 1 if a view exceeds its budget
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.db.session import engine
+
+
+def explain_prefix(dialect_name: str) -> str:
+    return "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+
+
+def explain(connection, statement: str, parameters) -> list:
+    """Plan lines for one DBAPI-level statement on `connection`."""
+    prefix = explain_prefix(connection.dialect.name)
+    rows = connection.exec_driver_sql(prefix + statement, parameters).fetchall()
+    if connection.dialect.name == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [" | ".join("" if v is None else str(v) for v in row) for row in rows]
+
+
+def capture_selects(db: Session, run) -> list:
+    """Run `run(db)` and return the (statement, parameters) of every SELECT it issued."""
+    captured = []
+    connection = db.connection()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        run(db)
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+    return captured
+
+
+def hot_queries():
+    # Imported here so the module stays importable from the crud layer
+    from app.crud import crud_analytics, crud_auth, crud_rollups, crud_trends
+    from app.models.sqlalchemy_models import Report
+
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    return [
+        ("analytics: crime type counts for a location",
+         lambda db: crud_analytics.get_crime_type_counts(db, 1, 30)),
+        ("analytics: recent reports per location",
+         lambda db: crud_analytics.get_recent_reports_for_locations(db, [1, 2], 10)),
+        ("analytics: risk matrix cells",
+         lambda db: crud_analytics._build_risk_matrix(db, 90)),
+        ("analytics: viewport heatmap cells",
+         lambda db: crud_analytics.get_heatmap_cells(db, -1.5, 36.6, -1.1, 37.1, 6, 30)),
+        ("analytics: hourly trend for a location",
+         lambda db: crud_trends._count_hours(db, week_ago, 1, None)),
+        ("analytics: daily trend for a crime type",
+         lambda db: crud_trends._count_days(db, week_ago, None, 1)),
+        ("auth: session by token",
+         lambda db: crud_auth.get_session_by_token(db, "query-plan-check")),
+        ("reports: rollup removal for a reporter",
+         lambda db: crud_rollups.remove_reports(db, Report.reporter_id == -1)),
+    ]
+
+
+def print_plans(engine=engine):
+    db = Session(bind=engine)
+    try:
+        for name, run in hot_queries():
+            print(f"\n=== {name}")
+            for statement, parameters in capture_selects(db, run):
+                print("  " + " ".join(statement.split())[:160])
+                for line in explain(db.connection(), statement, parameters):
+                    print(f"    -> {line}")
+            db.rollback()
+    finally:
+        db.close()
+
+
+# ----------------------------
+# Statement budgets
+# ----------------------------
+class StatementBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def count_statements(bind=engine):
+    """Collect every statement executed on `bind` inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+@contextmanager
+def statement_budget(limit: int, bind=engine, label: str = "block"):
+    """Raise StatementBudgetExceeded if the block issues more than `limit` statements."""
+    with count_statements(bind) as statements:
+        yield statements
+    if len(statements) > limit:
+        listing = "\n".join("  " + " ".join(st.split())[:160] for st in statements)
+        raise StatementBudgetExceeded(
+            f"{label} issued {len(statements)} SQL statements (budget {limit}):\n{listing}"
+        )
+
+
+def view_budgets(db: Session):
+    """(name, budget, run) for each rendered view, touching what its template reads."""
+    from app.crud import crud_reports
+    from app.models.sqlalchemy_models import Report
+
+    report_id, reporter_id = db.query(func.min(Report.report_id), func.min(Report.reporter_id)).one()
+
+    def dashboard_page(db):
+        reports, _ = crud_reports.get_reports_page(db, limit=50)
+        return [(r.crime_type.name, r.reporter.alias, getattr(r.location, "area", None)) for r in reports]
+
+    def report_detail(db):
+        r = crud_reports.get_report_detail(db, report_id)
+        return r and (r.crime_type.name, r.location.area, r.reporter.alias, [a.file_path for a in r.addons])
+
+    def reporter_reports(db):
+        return [(r.crime_type.name, r.location.area) for r in crud_reports.get_reports_by_reporter(db, reporter_id)]
+
+    return [
+        ("org dashboard: one page of reports", 1, dashboard_page),
+        ("org report view / files", 2, report_detail),
+        ("reporter reports", 1, reporter_reports),
+    ]
+
+
+def check_budgets(engine=engine) -> list:
+    """Run every view against `engine`; returns the failure messages."""
+    failures = []
+    db = Session(bind=engine)
+    try:
+        for name, budget, run in view_budgets(db):
+            db.expunge_all()
+            try:
+                with statement_budget(budget, bind=engine, label=name) as statements:
+                    run(db)
+                print(f"✅ {name}: {len(statements)}/{budget} statements")
+            except StatementBudgetExceeded as exc:
+                print(f"❌ {exc}")
+                failures.append(str(exc))
+    finally:
+        db.close()
+    return failures
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "budgets":
+        sys.exit(1 if check_budgets() else 0)
+    print_plans()
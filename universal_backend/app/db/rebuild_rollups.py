@@ -0,0 +1,17 @@
+# rebuild_rollups.py — recompute the daily_crime_counts rollup from reports.
+# Run from universal_backend/:  python -m app.db.rebuild_rollups
+from sqlalchemy.orm import sessionmaker
+from app.db.session import engine
+from app.db import migrations
+from app.crud.crud_rollups import rebuild_daily_counts
+
+# --- Initialize database ---
+# Create or upgrade the schema (stamped, so the API starts against it)
+migrations.upgrade(engine)
+SessionLocal = sessionmaker(bind=engine)
+db = SessionLocal()
+
+rows = rebuild_daily_counts(db)
+print(f"✅ Rollup rebuilt: {rows} daily_crime_counts rows.")
+
+db.close()
@@ -0,0 +1,14 @@
+# rebuild_search.py — recompute the report_search full-text index from reports
+# (e.g. after crime types or locations were renamed).
+# Run from universal_backend/:  python -m app.db.rebuild_search
+from sqlalchemy.orm import sessionmaker
+from app.db.session import engine
+from app.crud.crud_search import rebuild_index
+
+SessionLocal = sessionmaker(bind=engine)
+db = SessionLocal()
+
+rows = rebuild_index(db)
+print(f"✅ Search index rebuilt: {rows} reports indexed.")
+
+db.close()
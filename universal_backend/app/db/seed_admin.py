@@ -1,7 +1,8 @@
 # seed_admin.py
 from sqlalchemy.orm import sessionmaker
 from app.db.session import engine
-from app.models.sqlalchemy_models import Admin, Base
+from app.db import migrations
+from app.models.sqlalchemy_models import Admin
 # --- New Import for Argon2 ---
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError # Recommended for verification later
@@ -12,7 +13,8 @@ from argon2.exceptions import VerifyMismatchError # Recommended for verification
 ph = PasswordHasher()
 
 # --- Initialize database ---
-Base.metadata.create_all(bind=engine)
+# Create or upgrade the schema (stamped, so the API starts against it)
+migrations.upgrade(engine)
 SessionLocal = sessionmaker(bind=engine)
 db = SessionLocal()
 
@@ -1,14 +1,15 @@
 import os, sys
 from sqlalchemy.orm import sessionmaker
 from app.db.session import engine
-from app.models.sqlalchemy_models import CrimeType, Base
+from app.db import migrations
+from app.models.sqlalchemy_models import CrimeType
 
 # Ensure current working dir in path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 print("🔧 Added to sys.path:", os.getcwd())
 
-# Create tables if not exist
-Base.metadata.create_all(bind=engine)
+# Create or upgrade the schema (stamped, so the API starts against it)
+migrations.upgrade(engine)
 SessionLocal = sessionmaker(bind=engine)
 session = SessionLocal()
 
@@ -1,8 +1,9 @@
 import os
 import sys
 from app.db.session import engine
+from app.db import migrations
 from sqlalchemy.orm import sessionmaker
-from app.models.sqlalchemy_models import Location, Base
+from app.models.sqlalchemy_models import Location
 
 # --- Allow running directly ---
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,7 +13,8 @@ if SRC_DIR not in sys.path:
     print(f"🔧 Added to sys.path: {SRC_DIR}")
 
 # --- Initialize DB ---
-Base.metadata.create_all(bind=engine)
+# Create or upgrade the schema (stamped, so the API starts against it)
+migrations.upgrade(engine)
 SessionLocal = sessionmaker(bind=engine)
 session = SessionLocal()
 
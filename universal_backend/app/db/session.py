@@ -1,20 +1,255 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+import logging
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     # fallback to sqlite for quick local development
     DATABASE_URL = "sqlite:///./crimewatch.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}, pool_pre_ping=True)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+# ----------------------------
+# Engine profiles
+# ----------------------------
+def engine_profile(url) -> dict:
+    """
+    Tuning settings for the backend behind `url`, each overridable through
+    an environment variable:
+
+    SQLite: SQLITE_JOURNAL_MODE (WAL so readers are not blocked by report
+    writes), SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS, SQLITE_CACHE_SIZE_KB.
+
+    MySQL and others: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE (seconds, below MySQL's wait_timeout), DB_POOL_PRE_PING.
+    """
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {
+            "backend": "sqlite",
+            "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL").upper(),
+            "busy_timeout_ms": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+            "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper(),
+            "cache_size_kb": _env_int("SQLITE_CACHE_SIZE_KB", 20000),
+        }
+    return {
+        "backend": backend,
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+def _apply_sqlite_pragmas(engine, profile: dict, in_memory: bool):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute(f"PRAGMA journal_mode={profile['journal_mode']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(profile['busy_timeout_ms'])}")
+        cursor.execute(f"PRAGMA synchronous={profile['synchronous']}")
+        # negative cache_size is in KiB
+        cursor.execute(f"PRAGMA cache_size=-{int(profile['cache_size_kb'])}")
+        cursor.close()
+
+
+def build_engine(url: str, create=create_engine):
+    profile = engine_profile(url)
+    if profile["backend"] == "sqlite":
+        engine = create(url, connect_args={"check_same_thread": False})
+        # async engines take their connect events on the underlying sync engine
+        _apply_sqlite_pragmas(
+            getattr(engine, "sync_engine", engine), profile,
+            in_memory=make_url(url).database in (None, "", ":memory:"),
+        )
+    else:
+        engine = create(
+            url,
+            pool_size=profile["pool_size"],
+            max_overflow=profile["max_overflow"],
+            pool_timeout=profile["pool_timeout"],
+            pool_recycle=profile["pool_recycle"],
+            pool_pre_ping=profile["pool_pre_ping"],
+        )
+    return engine
+
+
+# Async drivers for each sync URL scheme (aiosqlite/aiomysql are in requirements)
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+    "mariadb": "aiomysql",
+    "postgresql": "asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the async driver for the same backend."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend!r} databases")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def log_engine_profile(engine, label: str = "primary"):
+    profile = ", ".join(f"{k}={v}" for k, v in engine_profile(engine.url).items())
+    logger.info("Database engine (%s) %s: %s", label, engine.url.render_as_string(hide_password=True), profile)
+
+
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for `async def` endpoints; same database, same tuning profile.
+# expire_on_commit=False so attributes stay readable after commit without
+# an implicit (blocking) refresh.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+async_engine = build_engine(ASYNC_DATABASE_URL, create=create_async_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# ----------------------------
+# Read replica
+# ----------------------------
+# Optional. Point DATABASE_REPLICA_URL at a replica of the primary (for a
+# local check, a second SQLite file copied from the first, or a second
+# MySQL instance replicating from the first). Without it, reads use the
+# primary.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+# How far behind the primary the replica may be. For this long after a
+# write, reads stay on the primary: in the process that committed it, and
+# for the client whose request made it (whichever worker serves the next
+# request; see begin_request).
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+
+_WROTE_KEY = "session_wrote"
+# Sessions opened with info={BOOKKEEPING: True} (cache rows, not user data)
+# never pin reads to the primary
+BOOKKEEPING = "bookkeeping"
+_last_write = 0.0
+
+
+class _RequestWrites:
+    """Per-request flags; mutated from worker threads, hence an object in the context var."""
+    __slots__ = ("pinned", "wrote")
+
+    def __init__(self, pinned: bool):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_request_writes: ContextVar = ContextVar("replica_request_writes", default=None)
+
+
+def begin_request(last_write_at=None):
+    """
+    Open a request scope. `last_write_at` is the wall-clock time (epoch
+    seconds, as sent back by the client) of that client's last write; reads
+    stay on the primary while it is within REPLICA_MAX_LAG_SECONDS.
+    Returns a token for end_request.
+    """
+    try:
+        pinned = time.time() - float(last_write_at) < REPLICA_MAX_LAG_SECONDS
+    except (TypeError, ValueError):
+        pinned = False
+    return _request_writes.set(_RequestWrites(pinned))
+
+
+def end_request(token) -> bool:
+    """Close the request scope; True if the request committed a write."""
+    state = _request_writes.get()
+    _request_writes.reset(token)
+    return bool(state and state.wrote)
+
+
+class ReadOnlySession(Session):
+    """Session for get_read_db; refuses to flush or run INSERT/UPDATE/DELETE."""
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("read-only session: use get_db for writes")
+
+
+@event.listens_for(ReadOnlySession, "do_orm_execute")
+def _refuse_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        raise RuntimeError("read-only session: use get_db for writes")
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_write(session):
+    global _last_write
+    if session.info.pop(_WROTE_KEY, False) and not session.info.get(BOOKKEEPING):
+        _last_write = time.monotonic()
+        state = _request_writes.get()
+        if state is not None:
+            state.wrote = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop(_WROTE_KEY, None)
+
+
+replica_engine = build_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, class_=ReadOnlySession)
+
+
+def read_engine():
+    """The engine reads should use right now."""
+    if replica_engine is None or time.monotonic() - _last_write < REPLICA_MAX_LAG_SECONDS:
+        return engine
+    state = _request_writes.get()
+    if state is not None and state.pinned:
+        return engine
+    return replica_engine
+
+
+def get_read_db():
+    db = ReadSessionLocal(bind=read_engine())
+    try:
+        yield db
+    finally:
+        db.close()
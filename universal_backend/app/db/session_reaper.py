@@ -0,0 +1,156 @@
+# session_reaper.py — deletes expired rows from the sessions table.
+#
+# Logins insert a session row and only logout removes one, so expired rows
+# pile up. The API lifespan runs `run_forever` in the background; each pass
+# deletes expired sessions in batches of SESSION_REAP_BATCH rows, committing
+# and pausing between batches so no single write transaction holds the
+# database (SQLite has one writer) for long.
+#
+# The same pass deletes analytics_cache rows that expired more than
+# ANALYTICS_CACHE_PURGE_GRACE seconds ago (see crud_cache.purge_expired).
+#
+# With SESSION_TOKEN_MODE=jwt it also keeps this process's token denylist
+# in step with the revoked_tokens table (every SESSION_DENYLIST_REFRESH
+# seconds), and reaps revocations whose tokens have all expired.
+#
+# One-off pass, from universal_backend/:  python -m app.db.session_reaper
+import os
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime
+
+from app.db.session import SessionLocal
+from app.crud import crud_auth, crud_cache
+from app.core import session_tokens
+
+logger = logging.getLogger(__name__)
+
+SESSION_REAP_INTERVAL = float(os.environ.get("SESSION_REAP_INTERVAL", "300"))
+SESSION_REAP_BATCH = int(os.environ.get("SESSION_REAP_BATCH", "500"))
+# Pause between batches, leaving the write lock free for requests
+SESSION_REAP_PAUSE = float(os.environ.get("SESSION_REAP_PAUSE", "0.05"))
+SESSION_DENYLIST_REFRESH = float(os.environ.get("SESSION_DENYLIST_REFRESH", "15"))
+SESSION_REAP_ENABLED = os.environ.get("SESSION_REAP_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+
+_lock = threading.Lock()
+_stats = {
+    "runs": 0,
+    "reclaimed": 0,
+    "revocations_reclaimed": 0,
+    "cache_rows_reclaimed": 0,
+    "last_run": None,
+    "last_reclaimed": 0,
+    "last_duration_ms": 0.0,
+    "last_error": None,
+}
+
+
+def _purge(purge_batch, db, batch_size: int, pause: float, cutoff: datetime) -> int:
+    total = 0
+    while True:
+        deleted = purge_batch(db, batch_size, now=cutoff)
+        total += deleted
+        if deleted < batch_size:
+            return total
+        time.sleep(pause)
+
+
+def reap_expired_sessions(batch_size: int = None, pause: float = None, session_factory=SessionLocal) -> int:
+    """Delete every session expired as of now, batch by batch; returns rows reclaimed."""
+    batch_size = batch_size or SESSION_REAP_BATCH
+    pause = SESSION_REAP_PAUSE if pause is None else pause
+    started = time.perf_counter()
+    reclaimed = 0
+    db = session_factory()
+    try:
+        # Fixed cutoff: sessions expiring mid-pass are left for the next pass
+        cutoff = datetime.utcnow()
+        reclaimed = _purge(crud_auth.purge_expired_sessions, db, batch_size, pause, cutoff)
+        if session_tokens.JWT_MODE:
+            revocations = _purge(crud_auth.purge_expired_revocations, db, batch_size, pause, cutoff)
+            session_tokens.denylist.prune(cutoff)
+            with _lock:
+                _stats["revocations_reclaimed"] += revocations
+        cache_rows = _purge(crud_cache.purge_expired, db, batch_size, pause, cutoff)
+        with _lock:
+            _stats["cache_rows_reclaimed"] += cache_rows
+    finally:
+        db.close()
+        with _lock:
+            _stats["runs"] += 1
+            _stats["reclaimed"] += reclaimed
+            _stats["last_run"] = datetime.utcnow().isoformat(timespec="seconds")
+            _stats["last_reclaimed"] = reclaimed
+            _stats["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if reclaimed:
+        logger.info("Session reaper reclaimed %d expired sessions", reclaimed)
+    return reclaimed
+
+
+async def run_forever(interval: float = None):
+    """Reap on a fixed interval until cancelled; failures are logged and retried next pass."""
+    interval = interval or SESSION_REAP_INTERVAL
+    while True:
+        try:
+            await asyncio.to_thread(reap_expired_sessions)
+            with _lock:
+                _stats["last_error"] = None
+        except Exception as exc:
+            logger.exception("Session reaper pass failed")
+            with _lock:
+                _stats["last_error"] = repr(exc)
+        await asyncio.sleep(interval)
+
+
+# ----------------------------
+# Signed-token denylist
+# ----------------------------
+def refresh_denylist(session_factory=SessionLocal) -> int:
+    """Pull revocations made since the last refresh (by any worker); returns rows loaded."""
+    db = session_factory()
+    try:
+        rows = crud_auth.get_revocations(db, session_tokens.denylist.last_revocation_id)
+        session_tokens.denylist.load(rows)
+        return len(rows)
+    finally:
+        db.close()
+
+
+async def refresh_denylist_forever(interval: float = None):
+    interval = interval or SESSION_DENYLIST_REFRESH
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh_denylist)
+        except Exception:
+            logger.exception("Token denylist refresh failed")
+
+
+def start() -> list:
+    """
+    Start the background maintenance tasks on the running event loop. In
+    jwt mode the denylist is loaded before this returns, so revocations
+    apply from the first request.
+    """
+    tasks = []
+    if session_tokens.JWT_MODE:
+        refresh_denylist()
+        tasks.append(asyncio.create_task(refresh_denylist_forever(), name="token-denylist"))
+    if SESSION_REAP_ENABLED:
+        tasks.append(asyncio.create_task(run_forever(), name="session-reaper"))
+    return tasks
+
+
+def stats() -> dict:
+    with _lock:
+        stats = dict(_stats, interval=SESSION_REAP_INTERVAL, batch_size=SESSION_REAP_BATCH)
+    if session_tokens.JWT_MODE:
+        stats["denylist"] = session_tokens.denylist.stats()
+    return stats
+
+
+if __name__ == "__main__":
+    reclaimed = reap_expired_sessions()
+    print(f"✅ Session reaper: {reclaimed} expired sessions deleted.")
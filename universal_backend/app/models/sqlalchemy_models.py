@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey, Index, JSON, event, func
 from sqlalchemy.orm import declarative_base, relationship
 
+from ..core import geo
+
 Base = declarative_base()
 
 # ----------------------------
@@ -56,6 +58,35 @@ class Session(Base):
     expires_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (
+        # token lookups use the unique index on token
+        Index("ix_sessions_user", "user_type", "user_id"),
+        # expired-session reaper
+        Index("ix_sessions_expires_at", "expires_at"),
+    )
+
+# ----------------------------
+# Revoked Signed Tokens (SESSION_TOKEN_MODE=jwt)
+# ----------------------------
+class RevokedToken(Base):
+    """
+    Denylist for signed session tokens. A row with `jti` revokes one token
+    (logout); a row with user_type/user_id revokes every token that user was
+    issued up to `revoked_at` (account deletion). Rows can be dropped once
+    `expires_at` passes, as every token they cover has expired by then.
+    """
+    __tablename__ = "revoked_tokens"
+    revocation_id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String(64), nullable=True, unique=True)
+    user_type = Column(String(50), nullable=True)
+    user_id = Column(Integer, nullable=True)
+    revoked_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
 # ----------------------------
 # Crime Types Table
 # ----------------------------
@@ -79,9 +110,33 @@ class Location(Base):
     latitude = Column(String(50), nullable=False)
     longitude = Column(String(50), nullable=False)
     description = Column(String(255), nullable=True)
+    # Numeric copies of latitude/longitude and their geohash, kept in sync
+    # on insert/update; used for bounding-box and grid-cell queries
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
     # ✅ Relationship to reports
     reports = relationship("Report", back_populates="location")
 
+    __table_args__ = (
+        Index("ix_locations_lat_lng", "lat", "lng"),
+        Index("ix_locations_geohash", "geohash"),
+    )
+
+    def sync_coordinates(self):
+        self.lat = geo.parse_coordinate(self.latitude)
+        self.lng = geo.parse_coordinate(self.longitude)
+        if self.lat is not None and self.lng is not None:
+            self.geohash = geo.encode(self.lat, self.lng)
+        else:
+            self.geohash = None
+
+
+@event.listens_for(Location, "before_insert")
+@event.listens_for(Location, "before_update")
+def _sync_location_coordinates(mapper, connection, target):
+    target.sync_coordinates()
+
 # ----------------------------
 # Reports Table
 # ----------------------------
@@ -100,6 +155,15 @@ class Report(Base):
     crime_type = relationship("CrimeType", back_populates="reports")
     location = relationship("Location", back_populates="reports")
 
+    # Match the hot query shapes: per-location/per-type windows and recent
+    # lists, per-reporter lookups, and date-ordered dashboard listings
+    __table_args__ = (
+        Index("ix_reports_location_date", "location_id", "date_reported"),
+        Index("ix_reports_crime_type_date", "crime_type_id", "date_reported"),
+        Index("ix_reports_reporter_date", "reporter_id", "date_reported"),
+        Index("ix_reports_date", "date_reported"),
+    )
+
 # ----------------------------
 # Report Addons Table
 # ----------------------------
@@ -112,4 +176,55 @@ class ReportAddon(Base):
     file_size = Column(Integer, nullable=True)
     date_uploaded = Column(DateTime, server_default=func.now())
     # ✅ Relationship back to Report
-    report = relationship("Report", back_populates="addons")
\ No newline at end of file
+    report = relationship("Report", back_populates="addons")
+
+    __table_args__ = (
+        Index("ix_report_addons_report", "report_id"),
+    )
+
+# ----------------------------
+# Daily Crime Counts (rollup of reports per location × crime type × day)
+# ----------------------------
+class DailyCrimeCount(Base):
+    __tablename__ = "daily_crime_counts"
+    location_id = Column(Integer, ForeignKey("locations.location_id"), primary_key=True)
+    crime_type_id = Column(Integer, ForeignKey("crime_types.crime_type_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_daily_crime_counts_day", "day"),
+    )
+
+# ----------------------------
+# Analytics Cache Table (serialized analytics results shared by all workers)
+# ----------------------------
+class AnalyticsCache(Base):
+    __tablename__ = "analytics_cache"
+    cache_id = Column(Integer, primary_key=True, autoincrement=True)
+    query_hash = Column(String(128), unique=True, nullable=False)
+    params = Column(JSON, nullable=False)
+    # NULL while the first computation of a key is still running
+    data = Column(JSON, nullable=True)
+    # Bumped every time the result is recomputed
+    version = Column(Integer, nullable=False, default=0)
+    # Location the result depends on; NULL means it spans every location
+    location_id = Column(Integer, nullable=True)
+    generated_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=True)
+    # Set while one worker recomputes the entry (stampede protection)
+    lease_until = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_analytics_cache_location", "location_id"),
+        Index("ix_analytics_cache_expires_at", "expires_at"),
+    )
+
+# ----------------------------
+# Schema Version Table (applied migrations, see app/db/migrations.py)
+# ----------------------------
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, server_default=func.now())
@@ -1,18 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models import sqlalchemy_models as models
 from app.crud import crud_auth
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_id_cursor
 
 router = APIRouter(prefix="/api/admin", tags=["Admin Management"])
 
 
+# Listings are keyset-paginated on the primary key. The body stays a plain
+# list; the cursor for the following page is sent in this header (absent on
+# the last page) and accepted back as ?cursor=.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _id_page(query, id_column, cursor: str, limit: int, response: Response):
+    if cursor:
+        try:
+            query = query.filter(id_column > decode_id_cursor(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    page = rows[:limit]
+    if len(rows) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(page[-1], id_column.key))
+    return page
+
+
 # -------------------------
 # LIST ORGANISATIONS
 # -------------------------
 @router.get("/organizations")
-def list_orgs(db: Session = Depends(get_db)):
-    orgs = db.query(models.ExternalOrg).all()
+def list_orgs(
+    response: Response,
+    cursor: str = Query(""),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    orgs = _id_page(db.query(models.ExternalOrg), models.ExternalOrg.org_id, cursor, limit, response)
     return [
         {
             "id": o.org_id,
@@ -27,13 +52,9 @@ def list_orgs(db: Session = Depends(get_db)):
 # DELETE ORG
 @router.delete("/organizations/{org_id}")
 def delete_org(org_id: int, db: Session = Depends(get_db)):
-    # use the correct model name (ExternalOrg)
-    org = db.query(models.ExternalOrg).filter(models.ExternalOrg.org_id == org_id).first()
-    if not org:
+    # also ends the org's sessions
+    if not crud_auth.delete_org(db, org_id):
         raise HTTPException(status_code=404, detail="Organization not found")
-
-    db.delete(org)
-    db.commit()
     return {"status": "ok", "message": "Organization deleted"}
 
 
@@ -41,15 +62,26 @@ def delete_org(org_id: int, db: Session = Depends(get_db)):
 # LIST REPORTERS
 # -------------------------
 @router.get("/reporters")
-def list_reporters(db: Session = Depends(get_db)):
-    reps = db.query(models.Reporter).all()
+def list_reporters(
+    response: Response,
+    sort: str = Query("id", pattern="^(id|reports)$", description="'reports' lists the most active reporters first"),
+    cursor: str = Query(""),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    try:
+        reps, next_cursor = crud_auth.list_reporters_with_counts(db, sort=sort, limit=limit, cursor=cursor or None)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
             "id": r.reporter_id,
             "alias": r.alias,
             "email": r.email,
             "phone": r.phone,
-            "reports": len(r.reports) if r.reports is not None else 0,
+            "reports": r.report_count,
         }
         for r in reps
     ]
@@ -58,12 +90,9 @@ def list_reporters(db: Session = Depends(get_db)):
 # DELETE REPORTER
 @router.delete("/reporters/{reporter_id}")
 def delete_reporter(reporter_id: int, db: Session = Depends(get_db)):
-    rep = db.query(models.Reporter).filter(models.Reporter.reporter_id == reporter_id).first()
-    if not rep:
+    # reports, rollup counts, search entries and sessions go with the reporter
+    if not crud_auth.delete_reporter(db, reporter_id):
         raise HTTPException(status_code=404, detail="Reporter not found")
-
-    db.delete(rep)
-    db.commit()
     return {"status": "ok", "message": "Reporter deleted"}
 
 
@@ -71,7 +100,7 @@ def delete_reporter(reporter_id: int, db: Session = Depends(get_db)):
 # LIST ADMINS
 # -------------------------
 @router.get("/admins/list")
-def list_admins(db: Session = Depends(get_db)):
+def list_admins(db: Session = Depends(get_read_db)):
     admins = db.query(models.Admin).all()
     return [
         {
@@ -100,10 +129,7 @@ def add_admin(password: str = Body(..., embed=True), db: Session = Depends(get_d
 # DELETE ADMIN
 @router.delete("/admins/{admin_id}")
 def delete_admin(admin_id: int, db: Session = Depends(get_db)):
-    admin = db.query(models.Admin).filter(models.Admin.admin_id == admin_id).first()
-    if not admin:
+    # also ends the admin's sessions
+    if not crud_auth.delete_admin(db, admin_id):
         raise HTTPException(status_code=404, detail="Admin not found")
-
-    db.delete(admin)
-    db.commit()
     return {"status": "ok", "message": "Admin deleted"}
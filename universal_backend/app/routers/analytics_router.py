@@ -1,15 +1,58 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models import sqlalchemy_models as models
 from app.schema import analytics as schemas
+from app.crud import crud_analytics, crud_cache, crud_trends
+from app.core.risk import RISK_WINDOW_DAYS
+from app.core import geo
+from app.core.cache import analytics_cache, ALL_LOCATIONS
+from app.db.instrumentation import SQL_DEBUG
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 
+# ------------------------------------------------------------------------------
+# SHARED HELPERS
+# ------------------------------------------------------------------------------
+RANGE_DAYS = {"7 days": 7, "30 days": 30, "90 days": 90}
+
+# Upper bound on locations per /analytics/batch call
+MAX_BATCH_LOCATIONS = 100
+
+
+def _days_for_range(range: str) -> int:
+    return RANGE_DAYS.get(range, 30)
+
+
+def _time_ago(when: datetime) -> str:
+    delta = datetime.utcnow() - when
+    hours = delta.total_seconds() // 3600
+    return f"{int(hours)}h ago" if hours < 24 else f"{int(hours // 24)}d ago"
+
+
+def _format_recent(reports: list) -> list:
+    return [
+        {
+            "crime_type": r["crime_type"],
+            "description": r["description"],
+            "time_ago": _time_ago(r["date_reported"]),
+        }
+        for r in reports
+    ]
+
+
+def _summary_from_counts(counts: list, crime_type_id: Optional[int]) -> list:
+    return [
+        {"crime_type": c["crime_type"], "count": c["recent"]}
+        for c in counts
+        if c["recent"] > 0 and (not crime_type_id or c["crime_type_id"] == crime_type_id)
+    ]
+
+
 # ------------------------------------------------------------------------------
 # SUMMARY COUNTS
 # ------------------------------------------------------------------------------
@@ -18,31 +61,10 @@ def analytics_summary(
     location_id: int = Query(...),
     crime_type_id: Optional[int] = Query(None),
     range: str = Query("30 days"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    days_map = {"7 days": 7, "30 days": 30, "90 days": 90}
-    days = days_map.get(range, 30)
-    since_date = datetime.utcnow() - timedelta(days=days)
-
-    crime_types = db.query(models.CrimeType).all()
-    summaries = []
-
-    for c in crime_types:
-        q = db.query(models.Report).filter(
-            models.Report.location_id == location_id,
-            models.Report.crime_type_id == c.crime_type_id,
-            models.Report.date_reported >= since_date
-        )
-
-        if crime_type_id and crime_type_id != c.crime_type_id:
-            continue
-
-        count = q.count()
-
-        if count > 0:
-            summaries.append({"crime_type": c.name, "count": count})
-
-    return summaries
+    counts = crud_analytics.get_crime_type_counts(db, location_id, _days_for_range(range))
+    return _summary_from_counts(counts, crime_type_id)
 
 
 # ------------------------------------------------------------------------------
@@ -51,29 +73,20 @@ def analytics_summary(
 @router.get("/risk-levels", response_model=list[schemas.RiskLevel])
 def risk_levels(
     location_id: int = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    crime_types = db.query(models.CrimeType).all()
-    results = []
-
-    for c in crime_types:
-        count = db.query(models.Report).filter(
-            models.Report.location_id == location_id,
-            models.Report.crime_type_id == c.crime_type_id
-        ).count()
+    return crud_analytics.get_risk_levels(db, location_id)
 
-        level = "Low"
-        if count >= 20:
-            level = "High"
-        elif count >= 5:
-            level = "Medium"
 
-        results.append({
-            "crime_type": c.name,
-            "level": level,
-        })
-
-    return results
+# ------------------------------------------------------------------------------
+# CITYWIDE RISK MAP
+# ------------------------------------------------------------------------------
+@router.get("/risk-map", summary="Risk level of every location and crime type")
+def risk_map(
+    days: int = Query(RISK_WINDOW_DAYS, ge=1, le=365),
+    db: Session = Depends(get_read_db),
+):
+    return crud_analytics.get_risk_matrix(db, days).citywide()
 
 
 # ------------------------------------------------------------------------------
@@ -83,29 +96,10 @@ def risk_levels(
 def recent_reports(
     location_id: int = Query(...),
     limit: int = Query(10),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    reports = (
-        db.query(models.Report)
-        .filter(models.Report.location_id == location_id)
-        .order_by(models.Report.date_reported.desc())
-        .limit(limit)
-        .all()
-    )
-
-    result = []
-    for r in reports:
-        delta = datetime.utcnow() - r.date_reported
-        hours = delta.total_seconds() // 3600
-        time_ago = f"{int(hours)}h ago" if hours < 24 else f"{int(hours // 24)}d ago"
-
-        result.append({
-            "crime_type": r.crime_type.name,
-            "description": r.description,
-            "time_ago": time_ago,
-        })
-
-    return result
+    reports = crud_analytics.get_recent_reports_for_locations(db, [location_id], limit)[location_id]
+    return _format_recent(reports)
 
 
 # ------------------------------------------------------------------------------
@@ -116,11 +110,115 @@ def full_analytics(
     location_id: int,
     crime_type_id: Optional[int] = None,
     range: str = "30 days",
+    # Primary, not replica: the result is shared with every worker for the cache TTL
     db: Session = Depends(get_db),
 ):
-    # Reuse the logic from endpoints above
-    return {
-        "risk_levels": risk_levels(location_id, db),
-        "report_counts": analytics_summary(location_id, crime_type_id, range, db),
-        "recent_reports": recent_reports(location_id, 10, db),
-    }
+    def compute():
+        counts = crud_analytics.get_crime_type_counts(db, location_id, _days_for_range(range))
+        return {
+            "report_counts": _summary_from_counts(counts, crime_type_id),
+            "recent_reports": recent_reports(location_id, 10, db),
+        }
+
+    params = {"location_id": location_id, "crime_type_id": crime_type_id, "range": range}
+    cached = crud_cache.get_or_compute("analytics_bundle", params, compute, location_id=location_id)
+    # Risk levels rank this location against every other one, so a write
+    # anywhere can change them; they come from the (separately cached) risk
+    # matrix on every request rather than from the per-location entry.
+    return {"risk_levels": crud_analytics.get_risk_levels(db, location_id), **cached}
+
+
+# ------------------------------------------------------------------------------
+# TREND
+# ------------------------------------------------------------------------------
+@router.get("/trend", summary="Report counts per hour, day or week")
+def trend(
+    granularity: str = Query("day", pattern="^(hour|day|week)$"),
+    days: int = Query(30, ge=1, le=365),
+    location_id: Optional[int] = Query(None),
+    crime_type_id: Optional[int] = Query(None),
+    db: Session = Depends(get_read_db),
+):
+    if granularity == "hour" and days > crud_trends.MAX_HOURLY_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Hourly trends are limited to {crud_trends.MAX_HOURLY_DAYS} days",
+        )
+    return crud_trends.get_trend(db, granularity, days, location_id, crime_type_id)
+
+
+# ------------------------------------------------------------------------------
+# VIEWPORT HEATMAP
+# ------------------------------------------------------------------------------
+@router.get("/heatmap/cells", summary="Pre-binned report counts for a map viewport")
+def heatmap_cells(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lng: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lng: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(12, ge=0, le=22),
+    days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Only locations inside the bounding box are aggregated, binned into
+    geohash cells sized for `zoom`, so a map pan fetches just the
+    visible cells. The box is widened to whole cells, so edge cells carry
+    their full counts and nearby viewports share one cache entry.
+    """
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(status_code=400, detail="min_lat/min_lng must not be greater than max_lat/max_lng")
+    precision = geo.precision_for_zoom(zoom)
+    bbox = geo.snap_to_cells(min_lat, min_lng, max_lat, max_lng, precision)
+    # In-process only: viewports are client-chosen, so this key space is
+    # too open-ended for the shared table (see crud_cache.get_or_compute)
+    return analytics_cache.get_or_compute(
+        ("heatmap_cells", bbox, precision, days),
+        lambda: {
+            "precision": precision,
+            "cells": crud_analytics.get_heatmap_cells(db, *bbox, precision, days),
+        },
+        tags=[ALL_LOCATIONS],
+    )
+
+
+# ------------------------------------------------------------------------------
+# BATCH ENDPOINT
+# ------------------------------------------------------------------------------
+@router.get("/batch", summary="Analytics bundles for several locations at once")
+def batch_analytics(
+    location_ids: list[int] = Query(..., max_length=MAX_BATCH_LOCATIONS),
+    crime_type_id: Optional[int] = None,
+    range: str = "30 days",
+    db: Session = Depends(get_read_db),
+):
+    """
+    Same bundle as `GET /analytics/?location_id=` for every requested
+    location (`?location_ids=1&location_ids=2...`). The number of queries
+    does not grow with the number of locations: one grouped summary
+    query, one windowed recent-reports query and the cached risk matrix.
+    """
+    location_ids = list(dict.fromkeys(location_ids))
+    matrix = crud_analytics.get_risk_matrix(db)
+    summaries = crud_analytics.get_summaries_for_locations(db, location_ids, _days_for_range(range), crime_type_id)
+    recent = crud_analytics.get_recent_reports_for_locations(db, location_ids, 10)
+
+    return [
+        {
+            "location_id": loc_id,
+            "risk_levels": matrix.for_location(loc_id),
+            "report_counts": summaries[loc_id],
+            "recent_reports": _format_recent(recent[loc_id]),
+        }
+        for loc_id in location_ids
+    ]
+
+
+# ------------------------------------------------------------------------------
+# CACHE STATS
+# ------------------------------------------------------------------------------
+# Only registered with SQL_DEBUG set
+if SQL_DEBUG:
+    @router.get("/cache/stats", summary="Hit/miss counters of the analytics result caches")
+    def cache_stats():
+        return crud_cache.stats()
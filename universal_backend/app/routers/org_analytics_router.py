@@ -1,67 +1,68 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
 from sqlalchemy import func
 
 from app.db.session import get_db
 from app.models import sqlalchemy_models as models
+from app.crud import crud_rollups, crud_cache, crud_trends
 
 router = APIRouter(prefix="/api/org", tags=["Org Analytics"])
 
+# Longest window the org dashboard may request
+MAX_DAYS = 365
+
 
 @router.get("/analytics")
 def get_org_analytics(
-    days: int = 30,
+    days: int = Query(30, ge=1, le=MAX_DAYS),
+    # Primary, not replica: the result is shared with every worker for the cache TTL
     db: Session = Depends(get_db)
 ):
-    since_date = datetime.utcnow() - timedelta(days=days)
-
-    # ----------------------------------------
-    # Fetch all reports used for multiple sections
-    # ----------------------------------------
-    reports = (
-        db.query(models.Report)
-        .filter(models.Report.date_reported >= since_date)
-        .all()
+    # Spans every location, so any report write invalidates it
+    return crud_cache.get_or_compute(
+        "org_analytics",
+        {"days": days},
+        lambda: _build_org_analytics(db, days),
     )
 
+
+def _build_org_analytics(db: Session, days: int):
+    # Every section is a grouped aggregate over the daily rollup, so the
+    # number of queries and rows held in memory do not depend on `days`
+    # or on how many reports fall inside the window.
+    since_day = crud_rollups.window_start(days)
+
     # ----------------------------------------
     # 1. HEATMAP
     # ----------------------------------------
     heatmap_raw = (
         db.query(
             models.Location.area.label("area"),
-            models.Location.latitude.label("lat"),
-            models.Location.longitude.label("lng"),
-            func.count(models.Report.report_id).label("count")
-        )
-        .join(models.Report, models.Report.location_id == models.Location.location_id)
-        .filter(
-            models.Report.date_reported >= since_date,
-            models.Location.latitude.isnot(None),
-            models.Location.longitude.isnot(None)
+            models.Location.lat.label("lat"),
+            models.Location.lng.label("lng"),
+            func.sum(models.DailyCrimeCount.count).label("count")
         )
+        .join(models.DailyCrimeCount, models.DailyCrimeCount.location_id == models.Location.location_id)
+        .filter(models.DailyCrimeCount.day >= since_day)
         .group_by(
             models.Location.area,
-            models.Location.latitude,
-            models.Location.longitude
+            models.Location.lat,
+            models.Location.lng
         )
-        .having(func.count(models.Report.report_id) > 0)
+        .having(func.sum(models.DailyCrimeCount.count) > 0)
         .all()
     )
 
     heatmap = []
     for h in heatmap_raw:
-        try:
-            lat = float(h.lat)
-            lng = float(h.lng)
-        except Exception:
+        # lat/lng are stored as numbers; NULL means the source strings did not parse
+        if h.lat is None or h.lng is None:
             continue
 
         heatmap.append({
             "area": h.area,
-            "lat": lat,
-            "lng": lng,
+            "lat": h.lat,
+            "lng": h.lng,
             "count": int(h.count)
         })
 
@@ -73,10 +74,10 @@ def get_org_analytics(
         for c in (
             db.query(
                 models.CrimeType.name.label("crime_type"),
-                func.count(models.Report.report_id).label("count")
+                func.sum(models.DailyCrimeCount.count).label("count")
             )
-            .join(models.Report, models.Report.crime_type_id == models.CrimeType.crime_type_id)
-            .filter(models.Report.date_reported >= since_date)
+            .join(models.DailyCrimeCount, models.DailyCrimeCount.crime_type_id == models.CrimeType.crime_type_id)
+            .filter(models.DailyCrimeCount.day >= since_day)
             .group_by(models.CrimeType.name)
             .all()
         )
@@ -85,11 +86,10 @@ def get_org_analytics(
     # ----------------------------------------
     # 3. REPORTS BY LOCATION
     # ----------------------------------------
+    # Same grouped rows as the heatmap, summed per area (one row per location)
     location_counts = {}
-    for r in reports:
-        if r.location:
-            loc = r.location.area
-            location_counts[loc] = location_counts.get(loc, 0) + 1
+    for h in heatmap_raw:
+        location_counts[h.area] = location_counts.get(h.area, 0) + int(h.count)
 
     location_counts_list = [
         {"location": k, "count": v}
@@ -100,22 +100,7 @@ def get_org_analytics(
     # ----------------------------------------
     # 4. TREND
     # ----------------------------------------
-    trend_raw = (
-        db.query(
-            func.date(models.Report.date_reported).label("date"),
-            func.count(models.Report.report_id).label("count")
-        )
-        .filter(models.Report.date_reported >= since_date)
-        .group_by(func.date(models.Report.date_reported))
-        .order_by(func.date(models.Report.date_reported))
-        .all()
-    )
-
-    trend = []
-    for t in trend_raw:
-        d = t.date
-        date_str = d if isinstance(d, str) else d.isoformat()
-        trend.append({"date": date_str, "count": int(t.count)})
+    trend = crud_trends.get_trend(db, "day", days)
 
     return {
         "heatmap": heatmap,
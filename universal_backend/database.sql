@@ -197,11 +197,15 @@ create table if not exists analytics_cache(
     cache_id int AUTO_INCREMENT PRIMARY KEY,
     query_hash varchar(128) unique not null,
     params json not null,
-    data json not null,
+    data json default null,
+    version int not null default 0,
+    location_id int default null,
     generated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     expires_at DATETIME DEFAULT null,
+    lease_until DATETIME DEFAULT null,
     index idx_analytics_query_hash(query_hash),
-    index idx_analytics_generated(generated_at)
+    index idx_analytics_generated(generated_at),
+    index idx_analytics_location(location_id)
 );
 create table if not exists sessions(
     session_id int AUTO_INCREMENT PRIMARY KEY,
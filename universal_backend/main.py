@@ -2,25 +2,34 @@ from typing import Optional, List
 from fastapi import FastAPI, Request, Form, Depends, APIRouter, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 from uuid import uuid4
 from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel
 import json
+import logging
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import time
 from fastapi import Body
 UPLOAD_DIR = os.environ.get("REPORT_UPLOAD_DIR", r"D:\Project\crime-app\uploads")
+WEB_APP_DIR = os.environ.get("WEB_APP_DIR", r"D:\Project\crime-app\web_app")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 from starlette import status
 from fastapi import Query
 from app.db.session import get_db
 
 from app.routers import analytics_router, org_analytics_router, admin_management_router
-from app.db import session as db_session
+from app.db import session as db_session, migrations, instrumentation, session_reaper
 from app.models import sqlalchemy_models as models
-from app.crud import crud_auth, crud_reports
+from app.crud import crud_auth, crud_reports, crud_analytics, crud_cache
+from app.crud import crud_auth_async, crud_reports_async, crud_search
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core import security
 
 
 
@@ -42,10 +51,32 @@ class ReportRequest(BaseModel):
     imageUrls: Optional[List[str]] = []
     occurrence_time: Optional[str] = None
 
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema is checked once here instead of create_all on every request
+    db_session.log_engine_profile(db_session.engine)
+    db_session.log_engine_profile(db_session.async_engine, "async")
+    if db_session.replica_engine is not None:
+        db_session.log_engine_profile(db_session.replica_engine, "replica")
+    migrations.ensure_schema(db_session.engine)
+    maintenance = session_reaper.start()
+    yield
+    for task in maintenance:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    security.shutdown_hasher()
+    await db_session.async_engine.dispose()
+
+
 app = FastAPI(
     title="CrimeWatch API",
     description="Backend API for CrimeWatch web and mobile applications",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -57,21 +88,90 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL accounting (statement count, DB time, slowest statement)
+instrumentation.install(db_session.engine)
+instrumentation.install(db_session.async_engine)
+if db_session.replica_engine is not None:
+    instrumentation.install(db_session.replica_engine)
+
+
+@app.middleware("http")
+async def sql_instrumentation(request: Request, call_next):
+    stats, token = instrumentation.begin_request()
+    try:
+        response = await call_next(request)
+    finally:
+        instrumentation.end_request(token)
+    route = request.scope.get("route")
+    instrumentation.record_route(f"{request.method} {route.path if route else '(unmatched)'}", stats)
+    if instrumentation.SQL_DEBUG:
+        response.headers.update(stats.headers())
+    return response
+
+# Read-your-writes across workers: a request that writes tells the client
+# when, and the client's next requests read from the primary until the
+# replica has had REPLICA_MAX_LAG_SECONDS to catch up.
+LAST_WRITE_COOKIE = "db_last_write"
+
+if db_session.replica_engine is not None:
+    @app.middleware("http")
+    async def replica_read_your_writes(request: Request, call_next):
+        token = db_session.begin_request(request.cookies.get(LAST_WRITE_COOKIE))
+        try:
+            response = await call_next(request)
+        finally:
+            wrote = db_session.end_request(token)
+        if wrote:
+            response.set_cookie(
+                LAST_WRITE_COOKIE,
+                f"{time.time():.3f}",
+                max_age=int(db_session.REPLICA_MAX_LAG_SECONDS) + 1,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
 router = APIRouter()
 app.include_router(analytics_router.router, prefix="/api")
 app.include_router(org_analytics_router.router, prefix="/api/org")
 app.include_router(admin_management_router.router, prefix="/api/admin")
 app.mount(
     "/static",
-    StaticFiles(directory=r"D:\Project\crime-app\web_app\static"),
+    StaticFiles(directory=os.path.join(WEB_APP_DIR, "static")),
     name="static"
 )
-app.mount("/uploads", StaticFiles(directory="D:/Project/crime-app/uploads"), name="uploads")
+app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 
 
 
 # Mount templates
-templates = Jinja2Templates(directory="D:\Project\crime-app\web_app")
+templates = Jinja2Templates(directory=WEB_APP_DIR)
+
+# Introspection endpoints, only registered with SQL_DEBUG set
+if instrumentation.SQL_DEBUG:
+    @app.get("/api/debug/sql-stats")
+    async def sql_stats():
+        """Statements and DB time per route since startup, busiest first."""
+        return instrumentation.route_stats()
+
+    @app.get("/api/debug/hasher-stats")
+    async def hasher_stats():
+        """Queue depth, throughput and rejections of the password hashing pool."""
+        return security.hasher_stats()
+
+    @app.get("/api/debug/session-reaper")
+    async def session_reaper_stats():
+        """Expired sessions reclaimed by the background reaper since startup (and the token denylist in jwt mode)."""
+        return session_reaper.stats()
+
+@app.exception_handler(security.HasherBusy)
+async def hasher_busy(request: Request, exc: security.HasherBusy):
+    # Login/registration storm: shed load rather than queue behind the hashing pool
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in attempts in progress, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 @app.get("/health")
 async def health_check():
@@ -82,7 +182,7 @@ async def health_check():
 async def landing_page(request: Request):
     # show transient flash messages set via cookies (e.g., after logout)
     flash = request.cookies.get("flash")
-    response = templates.TemplateResponse("index.html", {"request": request, "flash": flash})
+    response = templates.TemplateResponse(request, "index.html", {"request": request, "flash": flash})
     if flash:
         # clear the flash cookie so the message shows only once
         response.delete_cookie("flash")
@@ -91,7 +191,7 @@ async def landing_page(request: Request):
 # External Organization registration
 @app.get("/register", response_class=HTMLResponse)
 async def register_page(request: Request):
-    return templates.TemplateResponse("org_register.html", {"request": request})
+    return templates.TemplateResponse(request, "org_register.html", {"request": request})
 
 @app.post("/register")
 async def register_organization(
@@ -106,32 +206,30 @@ async def register_organization(
 ):
     if password != confirm_password:
         return templates.TemplateResponse(
-            "org_register.html",
+            request, "org_register.html",
             {"request": request, "error": "Passwords do not match"}
         )
-    # ensure tables exist
-    models.Base.metadata.create_all(bind=db_session.engine)
     existing = crud_auth.get_org_by_email(db, contact_email)
     if existing:
         return templates.TemplateResponse(
-            "org_register.html",
+            request, "org_register.html",
             {"request": request, "error": "An organization with that email already exists"}
         )
-    org = crud_auth.create_org(db, org_name, contact_person, contact_email, contact_phone, password)
+    hashed = await security.hash_password_async(password)
+    org = crud_auth.create_org(db, org_name, contact_person, contact_email, contact_phone, hashed_password=hashed)
     # redirect to org login with a flag
     return RedirectResponse(url="/org/login?registered=1", status_code=303)
 
 # Admin Routes
 @app.get("/admin/login", response_class=HTMLResponse)
 async def admin_login_page(request: Request):
-    return templates.TemplateResponse("admin_login.html", {"request": request})
+    return templates.TemplateResponse(request, "admin_login.html", {"request": request})
 
 @app.post("/admin/login")
 async def admin_login(request: Request, admin_id: str = Form(...), password: str = Form(...), db: Session = Depends(db_session.get_db)):
-    models.Base.metadata.create_all(bind=db_session.engine)
-    adm = crud_auth.authenticate_admin(db, admin_id, password)
-    if not adm:
-        return templates.TemplateResponse("admin_login.html", {"request": request, "error": "Invalid credentials"})
+    adm = crud_auth.get_admin_by_identifier(db, admin_id)
+    if not adm or not await security.verify_password_async(password, adm.password):
+        return templates.TemplateResponse(request, "admin_login.html", {"request": request, "error": "Invalid credentials"})
     # successful admin login: create a session and set a secure cookie, then redirect to admin dashboard
     sess = crud_auth.create_session(db, user_type="admin", user_id=adm.admin_id)
     adm.last_login = datetime.now(timezone.utc)
@@ -153,7 +251,7 @@ async def admin_dashboard(request: Request, db: Session = Depends(db_session.get
     if not sess or sess.user_type != "admin":
         return RedirectResponse(url="/admin/login", status_code=303)
     admin = crud_auth.get_admin_by_id(db, sess.user_id)
-    return templates.TemplateResponse("admin_dashboard.html", {"request": request, "admin": admin})
+    return templates.TemplateResponse(request, "admin_dashboard.html", {"request": request, "admin": admin})
 
 @app.post("/admin/logout")
 async def admin_logout(request: Request, db: Session = Depends(db_session.get_db)):
@@ -178,28 +276,26 @@ async def admin_logout_get(request: Request, db: Session = Depends(db_session.ge
 
 # Reporter API endpoints for mobile app
 @app.post('/api/reporters/register')
-async def api_register_reporter(payload: dict, db: Session = Depends(db_session.get_db)):
-    models.Base.metadata.create_all(bind=db_session.engine)
+async def api_register_reporter(payload: dict, db: AsyncSession = Depends(db_session.get_async_db)):
     alias = payload.get('alias')
     password = payload.get('password')
     email = payload.get('email')
     phone = payload.get('phone')
     if not alias or not password:
         return {"error": "alias and password required"}
-    existing = db.query(models.Reporter).filter(models.Reporter.alias == alias).first()
+    existing = await crud_auth_async.get_reporter_by_alias(db, alias)
     if existing:
         return {"error": "alias already exists"}
-    rep = crud_auth.create_reporter(db, alias, password, email=email, phone=phone)
+    rep = await crud_auth_async.create_reporter(db, alias, password, email=email, phone=phone)
     return {"status": "ok", "reporter_id": rep.reporter_id}
 
 @app.post("/api/reporters/login")
-async def api_login_reporter(payload: dict, db: Session = Depends(db_session.get_db)):
-    models.Base.metadata.create_all(bind=db_session.engine)
+async def api_login_reporter(payload: dict, db: AsyncSession = Depends(db_session.get_async_db)):
     identifier = payload.get("identifier")
     password = payload.get("password")
     if not identifier or not password:
         return {"error": "identifier and password required"}
-    rep = crud_auth.authenticate_reporter(db, identifier, password)
+    rep = await crud_auth_async.authenticate_reporter(db, identifier, password)
     if not rep:
         return {"error": "invalid credentials"}
     # Return profile details immediately
@@ -216,8 +312,8 @@ async def api_login_reporter(payload: dict, db: Session = Depends(db_session.get
     }
 
 @app.get("/api/reporters/{reporter_id}")
-async def api_get_reporter(reporter_id: int, db: Session = Depends(db_session.get_db)):
-    rep = crud_auth.get_reporter_by_id(db, reporter_id)
+async def api_get_reporter(reporter_id: int, db: AsyncSession = Depends(db_session.get_async_db)):
+    rep = await crud_auth_async.get_reporter_by_id(db, reporter_id)
     if not rep:
         return {"error": "reporter not found"}
     return {
@@ -232,13 +328,13 @@ async def api_get_reporter(reporter_id: int, db: Session = Depends(db_session.ge
 async def api_update_reporter(
     reporter_id: int,
     payload: ReporterUpdate,
-    db: Session = Depends(db_session.get_db)
+    db: AsyncSession = Depends(db_session.get_async_db)
 ):
-    rep = crud_auth.get_reporter_by_id(db, reporter_id)
+    rep = await crud_auth_async.get_reporter_by_id(db, reporter_id)
     if not rep:
         return {"error": "reporter not found"}
 
-    updated_rep = crud_auth.update_reporter(
+    updated_rep = await crud_auth_async.update_reporter(
         db,
         rep,
         alias=payload.alias,
@@ -257,16 +353,16 @@ async def api_create_report(
     location_id: int = Form(...),
     occurrence_time: str = Form(...),
     description: str = Form(...),
-    db: Session = Depends(db_session.get_db),
+    db: AsyncSession = Depends(db_session.get_async_db),
 ):
-    reporter = db.query(models.Reporter).filter(models.Reporter.reporter_id == reporter_id).first()
+    reporter = await crud_auth_async.get_reporter_by_id(db, reporter_id)
     if not reporter:
         raise HTTPException(status_code=404, detail="Reporter not found")
     try:
         occ_time = datetime.strptime(occurrence_time, "%d/%m/%Y %H:%M")
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid occurrence_time format. Use 'DD/MM/YYYY HH:MM'")
-    new_report = crud_reports.create_report(
+    new_report = await crud_reports_async.create_report(
         db=db,
         reporter_id=reporter_id,
         crime_type_id=crime_type_id,
@@ -282,6 +378,43 @@ async def api_create_report(
         "timestamp": new_report.date_reported,
     }
 
+@app.post("/api/reports/bulk")
+async def api_create_reports_bulk(request: Request, db: AsyncSession = Depends(db_session.get_async_db)):
+    """
+    Submit many queued reports at once. The body is either a JSON array of
+    report objects (or {"reports": [...]}) or NDJSON (Content-Type
+    application/x-ndjson), one report per line. Each report has the fields
+    of POST /api/reports. Valid reports are stored even when others are
+    rejected; the response has one result per submitted report, in order.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body or b"[]")
+            if isinstance(items, dict):
+                items = items.get("reports")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if len(items) > crud_reports_async.MAX_BULK_REPORTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {crud_reports_async.MAX_BULK_REPORTS} reports per request",
+        )
+
+    results = await crud_reports_async.create_reports_bulk(db, items)
+    created = sum(1 for r in results if r["status"] == "created")
+    return {
+        "status": "ok",
+        "created": created,
+        "rejected": len(results) - created,
+        "results": results,
+    }
+
 # -------------------------
 # Add report addons
 # -------------------------
@@ -289,9 +422,9 @@ async def api_create_report(
 async def api_add_report_addon(
     report_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(db_session.get_db),
+    db: AsyncSession = Depends(db_session.get_async_db),
 ):
-    rpt = db.query(models.Report).filter(models.Report.report_id == report_id).first()
+    rpt = await crud_reports_async.get_report(db, report_id)
     if not rpt:
         raise HTTPException(status_code=404, detail="Report not found")
     file_type = (
@@ -304,7 +437,7 @@ async def api_add_report_addon(
     with open(file_path, "wb") as f:
         f.write(await file.read())
     size = os.path.getsize(file_path)
-    addon = crud_reports.add_report_addon(db, report_id, file_path, file_type, size)
+    addon = await crud_reports_async.add_report_addon(db, report_id, file_path, file_type, size)
     return {
         "status": "ok",
         "addon_id": addon.addon_id,
@@ -313,14 +446,14 @@ async def api_add_report_addon(
     }
 
 @app.get("/api/crime-types")
-async def get_crime_types(db: Session = Depends(db_session.get_db)):
+async def get_crime_types(db: AsyncSession = Depends(db_session.get_async_db)):
     """Return all available crime types for dropdowns."""
-    types = db.query(models.CrimeType).all()
+    types = await crud_reports_async.get_crime_types(db)
     return [{"id": t.crime_type_id, "name": t.name, "description": t.description} for t in types]
 
 @app.get("/api/locations")
-async def get_locations(db: Session = Depends(db_session.get_db)):
-    locs = db.query(models.Location).all()
+async def get_locations(db: AsyncSession = Depends(db_session.get_async_db)):
+    locs = await crud_reports_async.get_locations(db)
     return [{"id": l.location_id, "area": l.area, "latitude": l.latitude, "longitude": l.longitude} for l in locs]
 
 @app.post("/api/reports/upload")
@@ -334,7 +467,7 @@ app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 @app.delete("/api/reporters/{reporter_id}", status_code=200)
 async def api_delete_reporter(
     reporter_id: int,
-    db: Session = Depends(db_session.get_db),
+    db: AsyncSession = Depends(db_session.get_async_db),
     # optionally protect with cookie/session token or require body confirmation
     confirm: bool = Query(False, description="Must be true to confirm deletion")
 ):
@@ -346,7 +479,7 @@ async def api_delete_reporter(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You must set confirm=true to delete account")
 
     # Basic auth check: confirm the reporter exists and optionally verify session/user identity
-    rep = crud_auth.get_reporter_by_id(db, reporter_id)
+    rep = await crud_auth_async.get_reporter_by_id(db, reporter_id)
     if not rep:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reporter not found")
 
@@ -356,7 +489,7 @@ async def api_delete_reporter(
     # if not sess or sess.user_type != "reporter" or sess.user_id != reporter_id:
     #     raise HTTPException(status_code=401, detail="Not authorized")
 
-    success = crud_auth.delete_reporter(db, reporter_id)
+    success = await crud_auth_async.delete_reporter(db, reporter_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Delete failed")
     return {"status": "ok", "message": "Account deleted"}
@@ -364,15 +497,14 @@ async def api_delete_reporter(
 # External Organization Routes
 @app.get("/org/login", response_class=HTMLResponse)
 async def org_login_page(request: Request):
-    return templates.TemplateResponse("org_login.html", {"request": request})
+    return templates.TemplateResponse(request, "org_login.html", {"request": request})
 
 @app.post("/org/login")
 async def org_login(request: Request, org_id: str = Form(...), password: str = Form(...), db: Session = Depends(db_session.get_db)):
-    models.Base.metadata.create_all(bind=db_session.engine)
-    org = crud_auth.authenticate_org(db, org_id, password)
-    if not org:
+    org = crud_auth.get_org_by_identifier(db, org_id)
+    if not org or not await security.verify_password_async(password, org.password):
         # pass back an error message to the template
-        return templates.TemplateResponse("org_login.html", {"request": request, "error": "Invalid credentials"})
+        return templates.TemplateResponse(request, "org_login.html", {"request": request, "error": "Invalid credentials"})
     # successful login: create a session and set a secure cookie, then redirect to dashboard
     sess = crud_auth.create_session(db, user_type="external_org", user_id=org.org_id)
     response = RedirectResponse(url="/org/dashboard", status_code=303)
@@ -384,7 +516,7 @@ async def org_login(request: Request, org_id: str = Form(...), password: str = F
 # Upload file for a report (image/video)
 # -------------------------
 @app.post("/api/reports/{report_id}/addons")
-async def api_upload_report_addon(report_id: int, file: UploadFile = File(...), db: Session = Depends(db_session.get_db)):
+async def api_upload_report_addon(report_id: int, file: UploadFile = File(...), db: AsyncSession = Depends(db_session.get_async_db)):
     """
     Multipart upload:
       - file: binary file (image/video)
@@ -392,7 +524,7 @@ async def api_upload_report_addon(report_id: int, file: UploadFile = File(...),
       { "status": "ok", "addon_id": 1, "file_path": "..." }
     """
     # verify report exists
-    rpt = db.query(models.Report).filter(models.Report.report_id == report_id).first()
+    rpt = await crud_reports_async.get_report(db, report_id)
     if not rpt:
         raise HTTPException(status_code=404, detail="report not found")
     # simple validation for file type (image/video) based on content type
@@ -412,65 +544,75 @@ async def api_upload_report_addon(report_id: int, file: UploadFile = File(...),
         content = await file.read()
         f.write(content)
     size = os.path.getsize(dest_path)
-    addon = crud_reports.add_report_addon(db=db, report_id=report_id, file_path=dest_path, file_type=file_type, file_size=size)
+    addon = await crud_reports_async.add_report_addon(db=db, report_id=report_id, file_path=dest_path, file_type=file_type, file_size=size)
     return {"status": "ok", "addon_id": addon.addon_id, "file_path": addon.file_path}
 
-@app.get("/org/dashboard", response_class=HTMLResponse)
-async def org_dashboard(request: Request, db: Session = Depends(db_session.get_db)):
-    token = request.cookies.get("session_token")
-    sess = crud_auth.get_session_by_token(db, token) if token else None
-    if not sess or sess.user_type != "external_org":
-        return RedirectResponse(url="/org/login", status_code=303)
-    org = crud_auth.get_org_by_id(db, sess.user_id)
-    # Fetch all crime types for the dropdown
-    crime_types = db.query(models.CrimeType).all()
-    reports = []
-    return templates.TemplateResponse(
-        "org_dashboard.html",
-        {
-            "request": request,
-            "org_name": org.org_name if org else None,
-            "reports": reports,
-            "crime_types": crime_types,  # 👈 pass to template
-        }
-    )
+# -------------------------
+# Org dashboard report listing (keyset-paginated)
+# -------------------------
+def _parse_day(value: str):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d") if value else None
+    except ValueError:
+        return None
+
+def _format_dashboard_report(r):
+    return {
+        "id": r.report_id,
+        "type": r.crime_type.name if r.crime_type else "N/A",
+        "reporter": r.reporter.alias if r.reporter else "Unknown",
+        "description": r.description[:80] + "..." if r.description else "",
+        "date": r.date_reported.strftime("%d %b %Y %H:%M") if r.date_reported else "N/A",
+        "location": getattr(r.location, "area", "N/A") if hasattr(r, "location") else "N/A",
+    }
+
+def _dashboard_page(db: Session, cursor: str, limit: int, type: str = "", date_from: str = "", date_to: str = "", q: str = ""):
+    """
+    One formatted page of dashboard reports plus the cursor for the next one.
+    With keywords `q` the page comes from the full-text index, best match first.
+    """
+    filters = dict(crime_type=type or None, occurred_from=_parse_day(date_from), occurred_to=_parse_day(date_to))
+    if q:
+        hits, next_cursor = crud_search.search_reports(db, q, limit=limit, cursor=cursor or None, **filters)
+        reports = crud_reports.get_reports_by_ids(db, [report_id for report_id, _ in hits])
+        scores = dict(hits)
+        return [dict(_format_dashboard_report(r), score=round(scores[r.report_id], 4)) for r in reports], next_cursor
+
+    reports, next_cursor = crud_reports.get_reports_page(db, limit=limit, cursor=cursor or None, **filters)
+    return [_format_dashboard_report(r) for r in reports], next_cursor
+
+def _html_dashboard_page(db: Session, cursor: str, limit: int, **filters):
+    # a stale or hand-edited cursor falls back to the first page
+    try:
+        return _dashboard_page(db, cursor, limit, **filters)
+    except ValueError:
+        return _dashboard_page(db, None, limit, **filters)
 
 @app.get("/org/dashboard", response_class=HTMLResponse)
-async def org_dashboard(request: Request, db: Session = Depends(db_session.get_db)):
+async def org_dashboard(
+    request: Request,
+    cursor: str = Query(""),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(db_session.get_db),
+    read_db: Session = Depends(db_session.get_read_db),
+):
     token = request.cookies.get("session_token")
     sess = crud_auth.get_session_by_token(db, token) if token else None
     if not sess or sess.user_type != "external_org":
         return RedirectResponse(url="/org/login", status_code=303)
     org = crud_auth.get_org_by_id(db, sess.user_id)
-    # Ensure tables exist (important)
-    models.Base.metadata.create_all(bind=db_session.engine)
     # Fetch all crime types for dropdown
-    crime_types = db.query(models.CrimeType).all()
-    # Get all reports (you can later filter or paginate)
-    reports = (
-        db.query(models.Report)
-        .join(models.CrimeType)
-        .join(models.Reporter)
-        .order_by(models.Report.date_reported.desc())
-        .all()
-    )
-    formatted_reports = []
-    for r in reports:
-        formatted_reports.append({
-            "id": r.report_id,
-            "type": r.crime_type.name if r.crime_type else "N/A",
-            "reporter": r.reporter.alias if r.reporter else "Unknown",
-            "description": r.description[:80] + "..." if r.description else "",
-            "date": r.date_reported.strftime("%d %b %Y %H:%M") if r.date_reported else "N/A",
-            "location": getattr(r.location, "area", "N/A") if hasattr(r, "location") else "N/A",
-        })
+    crime_types = read_db.query(models.CrimeType).all()
+    formatted_reports, next_cursor = _html_dashboard_page(read_db, cursor, limit)
     return templates.TemplateResponse(
-        "org_dashboard.html",
+        request, "org_dashboard.html",
         {
             "request": request,
             "org_name": org.org_name if org else None,
             "crime_types": crime_types,
             "reports": formatted_reports,
+            "next_cursor": next_cursor,
+            "filters": {},
         },
     )
 
@@ -480,50 +622,81 @@ async def org_dashboard_search(
     type: str = Form(""),
     date_from: str = Form(""),
     date_to: str = Form(""),
+    q: str = Form(""),
+    cursor: str = Form(""),
+    limit: int = Form(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(db_session.get_db),
+    read_db: Session = Depends(db_session.get_read_db),
 ):
     token = request.cookies.get("session_token")
     sess = crud_auth.get_session_by_token(db, token) if token else None
     if not sess or sess.user_type != "external_org":
         return RedirectResponse(url="/org/login", status_code=303)
     org = crud_auth.get_org_by_id(db, sess.user_id)
-    models.Base.metadata.create_all(bind=db_session.engine)
     # Fetch dropdown data again
-    crime_types = db.query(models.CrimeType).all()
-    query = db.query(models.Report).join(models.CrimeType).join(models.Reporter)
-    if type:
-        query = query.filter(models.CrimeType.name.ilike(f"%{type}%"))
-    if date_from:
-        try:
-            query = query.filter(models.Report.occurrence_time >= datetime.strptime(date_from, "%Y-%m-%d"))
-        except ValueError:
-            pass
-    if date_to:
-        try:
-            query = query.filter(models.Report.occurrence_time <= datetime.strptime(date_to, "%Y-%m-%d"))
-        except ValueError:
-            pass
-    reports = query.order_by(models.Report.date_reported.desc()).all()
-    formatted_reports = []
-    for r in reports:
-        formatted_reports.append({
-            "id": r.report_id,
-            "type": r.crime_type.name if r.crime_type else "N/A",
-            "reporter": r.reporter.alias if r.reporter else "Unknown",
-            "description": r.description[:80] + "..." if r.description else "",
-            "date": r.date_reported.strftime("%d %b %Y %H:%M") if r.date_reported else "N/A",
-            "location": getattr(r.location, "area", "N/A") if hasattr(r, "location") else "N/A",
-        })
+    crime_types = read_db.query(models.CrimeType).all()
+    filters = {"type": type, "date_from": date_from, "date_to": date_to, "q": q}
+    formatted_reports, next_cursor = _html_dashboard_page(read_db, cursor, limit, **filters)
     return templates.TemplateResponse(
-        "org_dashboard.html",
+        request, "org_dashboard.html",
         {
             "request": request,
             "org_name": org.org_name if org else "Unknown Organization",
             "reports": formatted_reports,
             "crime_types": crime_types,
+            "next_cursor": next_cursor,
+            "filters": filters,
         },
     )
 
+@app.get("/api/org/reports")
+async def org_reports_api(
+    request: Request,
+    cursor: str = Query(""),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    type: str = Query(""),
+    date_from: str = Query(""),
+    date_to: str = Query(""),
+    db: Session = Depends(db_session.get_db),
+    read_db: Session = Depends(db_session.get_read_db),
+):
+    """
+    JSON form of the dashboard listing. Pass the returned next_cursor back
+    as ?cursor= for the following page; it is null on the last page.
+    """
+    token = request.cookies.get("session_token")
+    sess = crud_auth.get_session_by_token(db, token) if token else None
+    if not sess or sess.user_type != "external_org":
+        raise HTTPException(status_code=401, detail="Not authorized")
+    try:
+        reports, next_cursor = _dashboard_page(read_db, cursor, limit, type=type, date_from=date_from, date_to=date_to)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"reports": reports, "next_cursor": next_cursor}
+
+@app.get("/api/org/reports/search")
+async def org_reports_search_api(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Keywords matched against description, crime type and location"),
+    cursor: str = Query(""),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    type: str = Query(""),
+    date_from: str = Query(""),
+    date_to: str = Query(""),
+    db: Session = Depends(db_session.get_db),
+    read_db: Session = Depends(db_session.get_read_db),
+):
+    """Ranked keyword search over reports; same paging contract as /api/org/reports."""
+    token = request.cookies.get("session_token")
+    sess = crud_auth.get_session_by_token(db, token) if token else None
+    if not sess or sess.user_type != "external_org":
+        raise HTTPException(status_code=401, detail="Not authorized")
+    try:
+        reports, next_cursor = _dashboard_page(read_db, cursor, limit, type=type, date_from=date_from, date_to=date_to, q=q)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"reports": reports, "next_cursor": next_cursor}
+
 @app.get("/org/logout")
 async def org_logout_get(request: Request, db: Session = Depends(db_session.get_db)):
     # allow GET for simple logout link usage
@@ -535,52 +708,25 @@ async def org_logout_get(request: Request, db: Session = Depends(db_session.get_
     return response
 
 @app.get("/api/analytics/regions")
-def region_heatmap(days: int = 30, db: Session = Depends(get_db)):
-    since = datetime.utcnow() - timedelta(days=days)
-
-    regions = db.query(models.Location).all()
-
-    results = []
+def region_heatmap(days: int = 30, db: Session = Depends(db_session.get_db)):
+    # Primary, not replica: the result is shared with every worker for the cache TTL
+    def compute():
+        # Counts and levels come from the shared risk engine, so the map
+        # uses the same scoring rules as /api/analytics/risk-levels
+        return crud_analytics.get_risk_matrix(db, days).location_summary()
 
-    for r in regions:
-        count = (
-            db.query(models.Report)
-            .filter(
-                models.Report.location_id == r.location_id,
-                models.Report.date_reported >= since
-            )
-            .count()
-        )
-
-        # Color logic
-        level = (
-            "High" if count >= 20 else
-            "Medium" if count >= 5 else
-            "Low"
-        )
-
-        results.append({
-            "location_id": r.location_id,
-            "area": r.area,
-            "count": count,
-            "level": level
-        })
-
-    return results
+    # Spans every location, so any report write invalidates it
+    return crud_cache.get_or_compute("region_heatmap", {"days": days}, compute)
 
 @app.get("/org/report/{report_id}", response_class=HTMLResponse)
 async def org_view_report(report_id: int, request: Request, db: Session = Depends(get_db)):
-    report = (
-        db.query(models.Report)
-        .filter(models.Report.report_id == report_id)
-        .first()
-    )
+    report = crud_reports.get_report_detail(db, report_id)
 
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
     return templates.TemplateResponse(
-        "org_view_report.html",
+        request, "org_view_report.html",
         {
             "request": request,
             "report": report
@@ -589,13 +735,13 @@ async def org_view_report(report_id: int, request: Request, db: Session = Depend
 
 @app.get("/org/report/{report_id}/files", response_class=HTMLResponse)
 async def org_view_report_files(report_id: int, request: Request, db: Session = Depends(get_db)):
-    report = db.query(models.Report).filter(models.Report.report_id == report_id).first()
+    report = crud_reports.get_report_detail(db, report_id)
 
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
     return templates.TemplateResponse(
-        "org_report_files.html",
+        request, "org_report_files.html",
         {"request": request, "report": report, "files": report.addons}
     )
 
@@ -603,7 +749,7 @@ async def org_view_report_files(report_id: int, request: Request, db: Session =
 def reporter_reports(
     reporter_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: Session = Depends(db_session.get_read_db)
 ):
     # Fetch reporter
     reporter = (
@@ -614,20 +760,16 @@ def reporter_reports(
 
     if not reporter:
         return templates.TemplateResponse(
-            "error.html",
+            request, "error.html",
             {"request": request, "message": "Reporter not found"},
             status_code=404
         )
 
-    # Fetch reports with addons, crime type, and location
-    reports = (
-        db.query(models.Report)
-        .filter(models.Report.reporter_id == reporter_id)
-        .all()
-    )
+    # Fetch reports with crime type and location
+    reports = crud_reports.get_reports_by_reporter(db, reporter_id)
 
     return templates.TemplateResponse(
-        "reporter_reports.html",
+        request, "reporter_reports.html",
         {
             "request": request,
             "reporter": reporter,
@@ -649,7 +791,6 @@ def delete_report(report_id: int, db: Session = Depends(get_db)):
             os.remove(file_path)
 
     # Delete report
-    db.delete(report)
-    db.commit()
+    crud_reports.delete_report(db, report)
 
     return RedirectResponse(url="/admin/dashboard", status_code=303)
@@ -0,0 +1,117 @@
+# Shared fixtures. The suite runs against a throwaway SQLite database that
+# the app's own startup (migrations.ensure_schema) creates at head.
+#
+# Run from universal_backend/:  python -m pytest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+_REPO = Path(__file__).resolve().parents[2]
+_TMP = tempfile.mkdtemp(prefix="crimewatch-tests-")
+
+# Must be set before the app modules are imported; they read it at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/test.db"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ["DATABASE_REPLICA_URL"] = ""
+os.environ["WEB_APP_DIR"] = str(_REPO / "web_app")
+os.environ["REPORT_UPLOAD_DIR"] = os.path.join(_TMP, "uploads")
+os.environ["SESSION_REAP_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.db import session as db_session, query_plans
+from app.models import sqlalchemy_models as models
+from app.crud import crud_auth, crud_rollups, crud_search
+from app.core.cache import session_cache, analytics_cache, trend_cache
+
+REPORTS_PER_REPORTER = 10
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(app_client):
+    """The app with no cookies and cold in-process caches."""
+    app_client.cookies.clear()
+    for cache in (session_cache, analytics_cache, trend_cache):
+        cache.clear()
+    return app_client
+
+
+@pytest.fixture
+def db(app_client):
+    session = db_session.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def seeded(app_client):
+    """
+    Three crime types, three locations and three reporters with
+    REPORTS_PER_REPORTER reports each, spread over every type and location
+    so a lazy load per row would show up as extra statements.
+    """
+    db = db_session.SessionLocal()
+    try:
+        crime_types = [models.CrimeType(name=f"Type {i}") for i in range(3)]
+        locations = [
+            models.Location(area=f"Area {i}", sub_area="Centre", latitude=str(-1.28 - i / 100), longitude=str(36.82 + i / 100))
+            for i in range(3)
+        ]
+        reporters = [models.Reporter(alias=f"seed-reporter-{i}", password="x") for i in range(3)]
+        db.add_all(crime_types + locations + reporters)
+        db.flush()
+        now = datetime.utcnow()
+        reports = []
+        for r, reporter in enumerate(reporters):
+            for i in range(REPORTS_PER_REPORTER):
+                report = models.Report(
+                    reporter_id=reporter.reporter_id,
+                    crime_type_id=crime_types[(r + i) % 3].crime_type_id,
+                    location_id=locations[i % 3].location_id,
+                    description=f"Seeded report {r}-{i}: phone stolen near the market",
+                    occurrence_time=now - timedelta(days=i),
+                    date_reported=now - timedelta(days=i, hours=r),
+                )
+                report.addons = [models.ReportAddon(file_path=f"seed-{r}-{i}.jpg", file_type="image")]
+                reports.append(report)
+        db.add_all(reports)
+        db.commit()
+        crud_rollups.rebuild_daily_counts(db)
+        crud_search.rebuild_index(db)
+        return {
+            "crime_type_ids": [c.crime_type_id for c in crime_types],
+            "location_ids": [l.location_id for l in locations],
+            "reporter_ids": [r.reporter_id for r in reporters],
+            "report_ids": [r.report_id for r in reports],
+        }
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def org_token(db):
+    """Session token for a freshly registered organisation."""
+    org = crud_auth.create_org(db, "Test Org", "Tester", f"org-{os.urandom(4).hex()}@example.org", "0700", hashed_password="x")
+    return crud_auth.create_session(db, "external_org", org.org_id).token
+
+
+@pytest.fixture
+def statement_budget():
+    """
+    `with statement_budget(n):` fails the test when the block issues more
+    than n SQL statements on the primary engine.
+    """
+    def budget(limit: int, label: str = "block"):
+        return query_plans.statement_budget(limit, bind=db_session.engine, label=label)
+    return budget
@@ -0,0 +1,132 @@
+# Deleting accounts: related reports leave the rollup and search index in
+# the same transaction, and the account's sessions stop authenticating.
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func
+
+from app.core import session_tokens
+from app.crud import crud_auth, crud_reports, crud_search
+from app.models.sqlalchemy_models import DailyCrimeCount, Report, Reporter
+
+ADMIN_API = "/api/admin/api/admin"
+
+
+@pytest.fixture(params=["db", "jwt"])
+def token_mode(request, monkeypatch):
+    """Run the test with opaque DB-backed tokens and with signed tokens."""
+    if request.param == "jwt":
+        monkeypatch.setattr(session_tokens, "JWT_MODE", True)
+        monkeypatch.setattr(session_tokens, "SESSION_SECRET", "s" * 40)
+        monkeypatch.setattr(session_tokens, "denylist", session_tokens.Denylist())
+    return request.param
+
+
+def _rollup_total(db):
+    return db.query(func.coalesce(func.sum(DailyCrimeCount.count), 0)).scalar()
+
+
+def _reporter_with_reports(db, seeded, n=3):
+    """A new reporter with `n` reports, all mentioning a unique keyword."""
+    keyword = f"kw{uuid4().hex[:10]}"
+    rep = crud_auth.create_reporter(db, f"reporter-{keyword}", "x" * 8)
+    for i in range(n):
+        crud_reports.create_report(
+            db, rep.reporter_id, seeded["crime_type_ids"][i % 3], seeded["location_ids"][i % 3],
+            f"Bag snatched {keyword}", datetime.utcnow(),
+        )
+    return rep.reporter_id, keyword
+
+
+def test_delete_reporter_cleans_rollup_and_index(db, seeded):
+    reporter_id, keyword = _reporter_with_reports(db, seeded)
+    before = _rollup_total(db)
+    assert len(crud_search.search_reports(db, keyword)[0]) == 3
+
+    assert crud_auth.delete_reporter(db, reporter_id)
+
+    assert _rollup_total(db) == before - 3
+    assert crud_search.search_reports(db, keyword)[0] == []
+    assert db.query(Report).filter(Report.reporter_id == reporter_id).count() == 0
+
+
+def test_delete_reporter_rolls_back_when_index_maintenance_fails(db, seeded, monkeypatch):
+    reporter_id, keyword = _reporter_with_reports(db, seeded)
+    before = _rollup_total(db)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(crud_search, "unindex_reports", broken)
+    with pytest.raises(RuntimeError):
+        crud_auth.delete_reporter(db, reporter_id)
+    monkeypatch.undo()
+
+    db.expire_all()
+    assert db.get(Reporter, reporter_id) is not None
+    assert db.query(Report).filter(Report.reporter_id == reporter_id).count() == 3
+    assert _rollup_total(db) == before
+    assert len(crud_search.search_reports(db, keyword)[0]) == 3
+
+
+def test_deleted_reporter_sessions_stop_authenticating(db, seeded):
+    reporter_id, _ = _reporter_with_reports(db, seeded, n=1)
+    token = crud_auth.create_session(db, "reporter", reporter_id).token
+    # validated once, so it is now served from session_cache
+    assert crud_auth.get_session_by_token(db, token).user_id == reporter_id
+    assert crud_auth.get_session_by_token(db, token).user_id == reporter_id
+
+    crud_auth.delete_reporter(db, reporter_id)
+
+    assert crud_auth.get_session_by_token(db, token) is None
+
+
+def test_logout_stops_authenticating(db):
+    rep = crud_auth.create_reporter(db, f"reporter-{uuid4().hex[:10]}", "x" * 8)
+    token = crud_auth.create_session(db, "reporter", rep.reporter_id).token
+    assert crud_auth.get_session_by_token(db, token) is not None
+
+    assert crud_auth.delete_session(db, token)
+
+    assert crud_auth.get_session_by_token(db, token) is None
+
+
+def test_admin_deleting_org_ends_its_sessions(client, db, token_mode):
+    org = crud_auth.create_org(db, "Doomed Org", "Tester", f"org-{uuid4().hex[:10]}@example.org", "0700", hashed_password="x")
+    token = crud_auth.create_session(db, "external_org", org.org_id).token
+    assert token_mode == "db" or session_tokens.looks_signed(token)
+    client.cookies.set("session_token", token)
+    assert client.get("/org/dashboard", follow_redirects=False).status_code == 200
+
+    assert client.delete(f"{ADMIN_API}/organizations/{org.org_id}").status_code == 200
+
+    assert client.get("/org/dashboard", follow_redirects=False).status_code == 303
+    assert client.delete(f"{ADMIN_API}/organizations/{org.org_id}").status_code == 404
+
+
+def test_admin_deleting_admin_ends_their_sessions(client, db, token_mode):
+    admin = crud_auth.create_admin(db, "x" * 8)
+    token = crud_auth.create_session(db, "admin", admin.admin_id).token
+    client.cookies.set("session_token", token)
+    assert client.get("/admin/dashboard", follow_redirects=False).status_code == 200
+
+    assert client.delete(f"{ADMIN_API}/admins/{admin.admin_id}").status_code == 200
+
+    assert client.get("/admin/dashboard", follow_redirects=False).status_code == 303
+
+
+def test_admin_deleting_reporter_cleans_up(client, db, seeded, token_mode):
+    reporter_id, keyword = _reporter_with_reports(db, seeded)
+    token = crud_auth.create_session(db, "reporter", reporter_id).token
+    assert crud_auth.get_session_by_token(db, token) is not None
+    before = _rollup_total(db)
+
+    assert client.delete(f"{ADMIN_API}/reporters/{reporter_id}").status_code == 200
+
+    db.expire_all()
+    assert db.get(Reporter, reporter_id) is None
+    assert _rollup_total(db) == before - 3
+    assert crud_search.search_reports(db, keyword)[0] == []
+    assert crud_auth.get_session_by_token(db, token) is None
+    assert client.delete(f"{ADMIN_API}/reporters/{reporter_id}").status_code == 404
@@ -0,0 +1,81 @@
+# Shared analytics_cache table: invalidation and the reaper's expiry purge.
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.crud import crud_cache
+from app.db import session_reaper
+from app.models.sqlalchemy_models import AnalyticsCache
+
+LOCATION = 987654
+
+
+@pytest.fixture
+def rows(db):
+    """Cache rows in every state, keyed by name; removed again afterwards."""
+    now = datetime.utcnow()
+    long_ago = now - timedelta(seconds=crud_cache.PURGE_GRACE + 60)
+    states = {
+        "live": dict(expires_at=now + timedelta(minutes=5)),
+        "recently_expired": dict(expires_at=now - timedelta(seconds=10)),
+        "long_expired": dict(expires_at=long_ago),
+        "computing": dict(lease_until=now + timedelta(seconds=30)),
+        "abandoned": dict(lease_until=None),
+        "stale_lease": dict(lease_until=long_ago),
+    }
+    created = {}
+    for name, values in states.items():
+        row = AnalyticsCache(
+            query_hash=f"test-{name}",
+            params={"endpoint": "test"},
+            location_id=LOCATION,
+            data=None if "lease_until" in values else {"n": 1},
+            **values,
+        )
+        db.add(row)
+        created[name] = row
+    db.commit()
+    expires = {name: row.expires_at for name, row in created.items()}
+    yield expires
+    db.rollback()
+    db.query(AnalyticsCache).filter(AnalyticsCache.query_hash.like("test-%")).delete(synchronize_session=False)
+    db.commit()
+
+
+def _expiry(db, name):
+    db.expire_all()
+    return db.query(AnalyticsCache.expires_at).filter(AnalyticsCache.query_hash == f"test-{name}").scalar()
+
+
+def _remaining(db):
+    db.expire_all()
+    return {
+        h.removeprefix("test-")
+        for (h,) in db.query(AnalyticsCache.query_hash).filter(AnalyticsCache.query_hash.like("test-%"))
+    }
+
+
+def test_invalidation_only_touches_live_rows(db, rows):
+    db.execute(crud_cache.expire_locations_stmt({LOCATION}))
+    db.commit()
+    assert _expiry(db, "live") <= datetime.utcnow()
+    assert _expiry(db, "long_expired") == rows["long_expired"]
+    assert _expiry(db, "recently_expired") == rows["recently_expired"]
+    assert _expiry(db, "computing") is None
+
+
+def test_purge_drops_long_expired_and_abandoned_rows(db, rows):
+    crud_cache.purge_expired(db, batch_size=1000)
+    assert _remaining(db) == {"live", "recently_expired", "computing"}
+
+
+def test_purge_works_in_batches(db, rows):
+    assert crud_cache.purge_expired(db, batch_size=1) == 1
+    assert len(_remaining(db)) == len(rows) - 1
+
+
+def test_reaper_pass_purges_the_cache(db, rows):
+    before = session_reaper.stats()["cache_rows_reclaimed"]
+    session_reaper.reap_expired_sessions(batch_size=2, pause=0)
+    assert "long_expired" not in _remaining(db)
+    assert session_reaper.stats()["cache_rows_reclaimed"] - before >= 3
@@ -0,0 +1,98 @@
+# POST /api/reports/bulk validation: per-item errors, JSON and NDJSON bodies.
+import json
+
+import pytest
+
+from app.crud.crud_reports_async import _validate_item
+
+BULK = "/api/reports/bulk"
+
+
+def _item(seeded, **overrides):
+    item = {
+        "reporter_id": seeded["reporter_ids"][0],
+        "crime_type_id": seeded["crime_type_ids"][0],
+        "location_id": seeded["location_ids"][0],
+        "description": "Bulk test report",
+        "occurrence_time": "01/02/2024 10:30",
+    }
+    item.update(overrides)
+    return {k: v for k, v in item.items() if v is not ...}
+
+
+def _fields(**fields):
+    item = {"crime_type_id": 1, "location_id": 1, "description": "x", "occurrence_time": "01/02/2024 10:30"}
+    item.update(fields)
+    return item
+
+
+@pytest.mark.parametrize("value", [..., None, "", "  "])
+def test_missing_id_is_required(value):
+    row, errors = _validate_item(_fields() if value is ... else _fields(reporter_id=value))
+    assert row is None
+    assert errors == ["reporter_id is required"]
+
+
+@pytest.mark.parametrize("value", ["abc", 2.5, True, [1], {"id": 1}, "1.5"])
+def test_wrong_typed_id_must_be_an_integer(value):
+    row, errors = _validate_item(_fields(reporter_id=value))
+    assert row is None
+    assert errors == ["reporter_id must be an integer"]
+
+
+@pytest.mark.parametrize("value, expected", [(7, 7), ("7", 7), (" 7 ", 7), (7.0, 7)])
+def test_integer_like_ids_are_accepted(value, expected):
+    row, errors = _validate_item(_fields(reporter_id=value))
+    assert errors == []
+    assert row["reporter_id"] == expected
+
+
+def test_json_array_reports_errors_per_item(client, seeded):
+    body = [
+        _item(seeded),
+        _item(seeded, location_id="north"),
+        _item(seeded, crime_type_id=...),
+        _item(seeded, description=" ", occurrence_time="yesterday"),
+    ]
+    response = client.post(BULK, json=body)
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["created"] == 1
+    assert payload["rejected"] == 3
+    results = payload["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["status"] == "created"
+    assert results[1]["errors"] == ["location_id must be an integer"]
+    assert results[2]["errors"] == ["crime_type_id is required"]
+    assert results[3]["errors"] == [
+        "description is required",
+        "occurrence_time must be 'DD/MM/YYYY HH:MM' or ISO 8601",
+    ]
+
+
+def test_ndjson_reports_errors_per_line(client, seeded):
+    lines = [_item(seeded, reporter_id=str(seeded["reporter_ids"][1])), _item(seeded, reporter_id=1.5), "not an object"]
+    response = client.post(
+        BULK,
+        content="\n".join(json.dumps(line) for line in lines) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["status"] == "created"
+    assert results[1]["errors"] == ["reporter_id must be an integer"]
+    assert results[2]["errors"] == ["report must be an object"]
+
+
+def test_unknown_ids_are_rejected(client, seeded):
+    response = client.post(BULK, json=[_item(seeded, location_id=999999)])
+    assert response.json()["results"][0]["status"] == "rejected"
+
+
+@pytest.mark.parametrize(
+    "content, content_type",
+    [("{not json", "application/json"), ('{"a": 1}\n{broken', "application/x-ndjson"), ('"text"', "application/json")],
+)
+def test_malformed_body_is_a_400(client, content, content_type):
+    response = client.post(BULK, content=content, headers={"Content-Type": content_type})
+    assert response.status_code == 400
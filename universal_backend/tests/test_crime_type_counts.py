@@ -0,0 +1,52 @@
+# crud_analytics.get_crime_type_counts over the daily rollup.
+from datetime import date, timedelta
+
+import pytest
+
+from app.crud import crud_analytics
+from app.models import sqlalchemy_models as models
+
+
+@pytest.fixture
+def history(db):
+    """A location with one crime type reported long ago and recently, and one never reported."""
+    old, recent, never = (models.CrimeType(name=f"Counts test {n}") for n in ("old", "recent", "never"))
+    location = models.Location(area="Counts test", latitude="0", longitude="0")
+    db.add_all([old, recent, never, location])
+    db.flush()
+    today = date.today()
+    db.add_all([
+        models.DailyCrimeCount(location_id=location.location_id, crime_type_id=old.crime_type_id,
+                               day=today - timedelta(days=400), count=7),
+        models.DailyCrimeCount(location_id=location.location_id, crime_type_id=recent.crime_type_id,
+                               day=today - timedelta(days=400), count=5),
+        models.DailyCrimeCount(location_id=location.location_id, crime_type_id=recent.crime_type_id,
+                               day=today - timedelta(days=2), count=2),
+    ])
+    db.commit()
+    yield location.location_id, {"old": old.name, "recent": recent.name, "never": never.name}
+    db.query(models.DailyCrimeCount).filter(models.DailyCrimeCount.location_id == location.location_id).delete()
+    for row in (old, recent, never, location):
+        db.delete(row)
+    db.commit()
+
+
+def _counts(db, location_id, days):
+    return {c["crime_type"]: c["recent"] for c in crud_analytics.get_crime_type_counts(db, location_id, days)}
+
+
+def test_window_excludes_older_rollup_rows(db, history):
+    location_id, names = history
+    counts = _counts(db, location_id, 30)
+    assert counts[names["recent"]] == 2
+    # Types with nothing in the window are still listed, with zero
+    assert counts[names["old"]] == 0
+    assert counts[names["never"]] == 0
+
+
+def test_no_window_counts_all_history(db, history):
+    location_id, names = history
+    counts = _counts(db, location_id, None)
+    assert counts[names["recent"]] == 7
+    assert counts[names["old"]] == 7
+    assert counts[names["never"]] == 0
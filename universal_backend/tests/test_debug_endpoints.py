@@ -0,0 +1,17 @@
+# The introspection endpoints are only registered with SQL_DEBUG set, which
+# the test environment leaves off.
+import pytest
+
+
+@pytest.mark.parametrize("path", [
+    "/api/debug/sql-stats",
+    "/api/debug/hasher-stats",
+    "/api/debug/session-reaper",
+    "/api/analytics/cache/stats",
+])
+def test_debug_endpoints_are_not_exposed(client, path):
+    assert client.get(path).status_code == 404
+
+
+def test_no_sql_headers(client):
+    assert "X-DB-Statements" not in client.get("/health").headers
@@ -0,0 +1,52 @@
+# GET /api/analytics/heatmap/cells: bbox validation, snapping and caching.
+import pytest
+
+from app.core import geo
+from app.core.cache import analytics_cache
+from app.models.sqlalchemy_models import AnalyticsCache
+
+CELLS = "/api/analytics/heatmap/cells"
+
+
+def _bbox(min_lat, min_lng, max_lat, max_lng, **extra):
+    return {"min_lat": min_lat, "min_lng": min_lng, "max_lat": max_lat, "max_lng": max_lng, **extra}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [_bbox(-1.2, 36.7, -1.3, 36.9), _bbox(-1.3, 36.9, -1.2, 36.7)],
+    ids=["lat", "lng"],
+)
+def test_inverted_bbox_is_a_400(client, params):
+    assert client.get(CELLS, params=params).status_code == 400
+
+
+def test_snap_covers_whole_cells():
+    precision = 5
+    snapped = geo.snap_to_cells(-1.2901, 36.8012, -1.2703, 36.8344, precision)
+    low = geo.bounds(geo.encode(-1.2901, 36.8012, precision))
+    high = geo.bounds(geo.encode(-1.2703, 36.8344, precision))
+    assert snapped == (low[0], low[1], high[2], high[3])
+    assert snapped[0] <= -1.2901 and snapped[2] >= -1.2703
+    assert snapped[1] <= 36.8012 and snapped[3] >= 36.8344
+
+
+def test_edge_cells_carry_their_full_count(client, seeded):
+    # A sliver of a viewport touching the seeded locations' cell, and one covering the city
+    wide = client.get(CELLS, params=_bbox(-2.0, 36.0, -0.5, 37.5, zoom=12)).json()
+    sliver = client.get(CELLS, params=_bbox(-1.2801, 36.8199, -1.2800, 36.8200, zoom=12)).json()
+    assert sliver["cells"]
+    wide_counts = {c["geohash"]: c["count"] for c in wide["cells"]}
+    for cell in sliver["cells"]:
+        assert cell["count"] == wide_counts[cell["geohash"]]
+
+
+def test_nearby_viewports_share_an_in_process_entry(client, db, seeded):
+    rows_before = db.query(AnalyticsCache).count()
+    first = client.get(CELLS, params=_bbox(-1.3, 36.81, -1.27, 36.84, zoom=12))
+    hits = analytics_cache.hits
+    second = client.get(CELLS, params=_bbox(-1.2999, 36.8101, -1.2701, 36.8399, zoom=12))
+    assert second.json() == first.json()
+    assert analytics_cache.hits == hits + 1
+    # Viewports never reach the shared table
+    assert db.query(AnalyticsCache).count() == rows_before
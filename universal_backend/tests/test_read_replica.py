@@ -0,0 +1,60 @@
+# Replica routing in db/session.py: reads follow a client's own writes.
+import time
+
+import pytest
+from sqlalchemy import false, update
+
+from app.db import session as db_session
+from app.crud import crud_cache
+from app.models.sqlalchemy_models import CrimeType
+
+REPLICA = object()
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Pretend a replica is configured and this process has not written lately."""
+    monkeypatch.setattr(db_session, "replica_engine", REPLICA)
+    monkeypatch.setattr(db_session, "_last_write", time.monotonic() - 3600)
+
+
+def test_reads_use_the_replica_without_a_recent_write(replica):
+    token = db_session.begin_request(None)
+    try:
+        assert db_session.read_engine() is REPLICA
+    finally:
+        db_session.end_request(token)
+
+
+def test_recent_write_from_another_worker_pins_reads(replica):
+    token = db_session.begin_request(str(time.time() - 1))
+    try:
+        assert db_session.read_engine() is db_session.engine
+    finally:
+        db_session.end_request(token)
+
+
+@pytest.mark.parametrize("last_write_at", [str(time.time() - 3600), "garbage"])
+def test_old_or_bad_write_time_does_not_pin(replica, last_write_at):
+    token = db_session.begin_request(last_write_at)
+    try:
+        assert db_session.read_engine() is REPLICA
+    finally:
+        db_session.end_request(token)
+
+
+def test_commit_marks_the_request_as_written(db, replica):
+    token = db_session.begin_request(None)
+    try:
+        db.execute(update(CrimeType).where(false()).values(name="unused"))
+        db.commit()
+    finally:
+        assert db_session.end_request(token) is True
+
+
+def test_analytics_cache_bookkeeping_is_not_a_write(app_client, replica):
+    token = db_session.begin_request(None)
+    try:
+        crud_cache.get_or_compute("replica_test", {"n": time.time()}, lambda: {"ok": True})
+    finally:
+        assert db_session.end_request(token) is False
@@ -0,0 +1,95 @@
+# Risk tiers from core/risk.py on hand-built count matrices, and as served.
+from datetime import datetime
+
+import numpy as np
+
+from app.core import risk
+from app.crud import crud_auth
+from app.models import sqlalchemy_models as models
+
+
+def _matrix(column, window_days=30):
+    counts = np.array(column, dtype=np.int64).reshape(-1, 1)
+    ids = list(range(1, len(column) + 1))
+    return risk.RiskMatrix(ids, [f"Area {i}" for i in ids], ["Theft"], counts, window_days)
+
+
+def _levels(matrix):
+    return [loc["level"] for loc in matrix.location_summary()]
+
+
+def test_sparse_city_does_not_flag_a_few_reports_as_high():
+    # 99 quiet locations and one with 3 reports in 30 days
+    levels = _levels(_matrix([0] * 99 + [3]))
+    assert levels[-1] == "Low"
+    assert set(levels) == {"Low"}
+
+
+def test_percentile_ranks_only_locations_with_reports():
+    # 80 quiet locations, then 1..20 reports over 90 days (rates stay below HIGH_RATE)
+    column = [0] * 80 + list(range(1, 21))
+    levels = _levels(_matrix(column, window_days=90))
+    by_count = dict(zip(column, levels))
+    assert by_count[20] == "High"       # mid-rank 19.5/20
+    assert by_count[15] == "Medium"     # 14.5/20
+    assert by_count[3] == "Low"         # 2.5/20, rate 1 per 30 days
+    assert by_count[0] == "Low"
+
+
+def test_ties_share_the_mid_rank():
+    pct = risk._percentiles(np.array([[0], [4], [4], [4], [4]]))
+    assert pct[0, 0] == 0.0
+    assert np.allclose(pct[1:, 0], 0.5)
+
+
+def test_columns_are_ranked_independently():
+    counts = np.array([[0, 10], [5, 0], [5, 1], [9, 2]])
+    pct = risk._percentiles(counts)
+    assert np.allclose(pct[:, 0], [0.0, 1 / 3, 1 / 3, 5 / 6])
+    assert np.allclose(pct[:, 1], [5 / 6, 0.0, 1 / 6, 0.5])
+
+
+# ----------------------------
+# Bundle and /risk-levels agree after writes elsewhere
+# ----------------------------
+def _post_reports(client, reporter_id, crime_type_id, location_id, n):
+    item = {
+        "reporter_id": reporter_id,
+        "crime_type_id": crime_type_id,
+        "location_id": location_id,
+        "description": "Risk ranking test report",
+        "occurrence_time": datetime.utcnow().strftime("%d/%m/%Y %H:%M"),
+    }
+    response = client.post("/api/reports/bulk", json=[item] * n)
+    assert response.json()["created"] == n
+
+
+def _theft_level(client, crime_type, location_id):
+    bundle = client.get("/api/analytics/", params={"location_id": location_id}).json()["risk_levels"]
+    levels = client.get("/api/analytics/risk-levels", params={"location_id": location_id}).json()
+    from_bundle = {r["crime_type"]: r["level"] for r in bundle}[crime_type]
+    from_levels = {r["crime_type"]: r["level"] for r in levels}[crime_type]
+    assert from_bundle == from_levels
+    return from_bundle
+
+
+def test_bundle_risk_follows_writes_at_other_locations(client, db):
+    # A crime type of its own, so only A, B and C are ranked in its column
+    theft = models.CrimeType(name="Theft (ranking test)")
+    a, b, c = (models.Location(area=f"Ranking {name}", latitude="0", longitude="0") for name in "ABC")
+    reporter = models.Reporter(alias="ranking-test-reporter", password="x")
+    db.add_all([theft, a, b, c, reporter])
+    db.commit()
+    try:
+        _post_reports(client, reporter.reporter_id, theft.crime_type_id, b.location_id, 3)
+        _post_reports(client, reporter.reporter_id, theft.crime_type_id, c.location_id, 4)
+        assert _theft_level(client, theft.name, c.location_id) == "Medium"   # mid-rank 1.5/2
+
+        _post_reports(client, reporter.reporter_id, theft.crime_type_id, a.location_id, 10)
+        assert _theft_level(client, theft.name, c.location_id) == "Low"      # mid-rank 1.5/3
+    finally:
+        # Through crud_auth so rollups and the search index drop the reports too
+        crud_auth.delete_reporter(db, reporter.reporter_id, hard_delete=True)
+        for row in (theft, a, b, c):
+            db.delete(row)
+        db.commit()
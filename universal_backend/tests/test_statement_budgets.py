@@ -0,0 +1,56 @@
+# Statement budgets for the rendered org/reporter views. Each page issues a
+# fixed number of queries however many reports (and distinct reporters,
+# crime types and locations) it shows; a lazy load in a template breaks it.
+import pytest
+
+from app.db.query_plans import StatementBudgetExceeded
+from app.models.sqlalchemy_models import Report
+
+
+def test_org_dashboard(client, seeded, org_token, statement_budget):
+    client.cookies.set("session_token", org_token)
+    # session + org, crime types, one page of reports with their relations
+    with statement_budget(4, "GET /org/dashboard"):
+        response = client.get("/org/dashboard")
+    assert response.status_code == 200
+    for report_id in seeded["report_ids"]:
+        assert f"/org/report/{report_id}/files" in response.text
+
+
+def test_org_dashboard_search(client, seeded, org_token, statement_budget):
+    client.cookies.set("session_token", org_token)
+    with statement_budget(5, "POST /org/dashboard"):
+        response = client.post("/org/dashboard", data={"q": "phone stolen"})
+    assert response.status_code == 200
+    assert response.text.count("/files") == len(seeded["report_ids"])
+
+
+def test_org_view_report(client, seeded, statement_budget):
+    report_id = seeded["report_ids"][0]
+    with statement_budget(2, "GET /org/report/{id}"):
+        response = client.get(f"/org/report/{report_id}")
+    assert response.status_code == 200
+    assert "Seeded report" in response.text
+
+
+def test_org_view_report_files(client, seeded, statement_budget):
+    report_id = seeded["report_ids"][0]
+    with statement_budget(2, "GET /org/report/{id}/files"):
+        response = client.get(f"/org/report/{report_id}/files")
+    assert response.status_code == 200
+    assert "seed-0-0.jpg" in response.text
+
+
+def test_reporter_reports(client, seeded, statement_budget):
+    reporter_id = seeded["reporter_ids"][1]
+    # reporter, then every report with its crime type and location
+    with statement_budget(2, "GET /reporter/{id}/reports"):
+        response = client.get(f"/reporter/{reporter_id}/reports")
+    assert response.status_code == 200
+    assert response.text.count("Seeded report 1-") == 10
+
+
+def test_budget_catches_lazy_loads(db, seeded, statement_budget):
+    with pytest.raises(StatementBudgetExceeded):
+        with statement_budget(2, "lazy loop"):
+            [r.crime_type.name for r in db.query(Report).limit(10)]